@@ -1,60 +1,26 @@
-import urllib.request 
-import pandas as pd
-import os
-from datetime import datetime as dt
-
-for area_id in range(1, 26):  
-    url = f"https://www.star.nesdis.noaa.gov/smcd/emb/vci/VH/get_TS_admin.php?country=UKR&provinceID={area_id}&year1=1981&year2=2024&type=Mean"
-    time = dt.now().strftime("%d%m%Y%H%M%S")
-    filename = f'vhi_id_{area_id}_{time}.csv'
-    if os.path.exists(filename):
-        print(f"Файл для області {area_id} вже існує: {filename}. Пропускаємо завантаження.")
-        continue
-    
-    try:
-        vhi_url = urllib.request.urlopen(url)
-        with open(filename, 'wb') as out:
-            out.write(vhi_url.read())
-            out.close
-        print(f"VHI дата для області {area_id} завантажена/збережена у {filename}")
-    except Exception as e:
-        print(f"Помилка для області {area_id}: {e}")
-
-def read_vhi_from_csv(directory):
-    data_frames = []
-    for filename in os.listdir(directory):
-        if filename.startswith('vhi_id_') and filename.endswith('.csv'):
-            filepath = os.path.join(directory, filename)
-            try:
-                area_id = int(filename.split('_')[2])
-            except (IndexError, ValueError) as e:
-                print(f"Невірний формат імені файлу: {filename}. Видаляємо файл.")
-                os.remove(filepath) 
-                continue
-            df = pd.read_csv(filepath, index_col=False, header=1)
-            df['area_ID'] = area_id  
-            
-            data_frames.append(df)    
-    return pd.concat(data_frames, ignore_index=True)
+from vhi_download import download_countries
+from vhi_data import load_partitions
+from vhi_query import VhiIndex
+from vhi_regions import area_names
+from vhi_droughts import DROUGHT_THRESHOLDS, drought_flags, area_count, affected_counts, affected_areas, sensitivity_table, min_affected
+
+COUNTRIES = ['UKR']
+
+# Паралельне завантаження з повторними спробами у розділ ./<країна>; вже
+# завантажені області пропускаються за маніфестом vhi_manifest.json
+download_countries(COUNTRIES, '.', year1=1981, year2=2024)
+
+def read_vhi_from_csv(root, countries):
+    # Розбір CSV лише при зміні файлів, інакше — з типізованого кешу ./country=<країна>/vhi.feather
+    return load_partitions(root, countries)
 
 directory = '.' 
-vhi_data = read_vhi_from_csv(directory)
-vhi_data.columns = vhi_data.columns.str.strip().str.replace('<br>', '', regex=True)
-vhi_data['year'] = vhi_data['year'].astype(str).str.extract(r'(\d+)')
-vhi_data = vhi_data.dropna(subset=['year']).copy() 
-vhi_data['year'] = vhi_data['year'].astype(int) 
+vhi_data = read_vhi_from_csv(directory, COUNTRIES)
 # print("Стовпці у фреймі:")
 # print(vhi_data.columns)
 
-area_map = {
-    1: "Вінницька", 2: "Волинська", 3: "Дніпропетровська", 4: "Донецька",
-    5: "Житомирська", 6: "Закарпатська", 7: "Запорізька", 8: "Івано-Франківська",
-    9: "Київська", 10: "Кіровоградська", 11: "Луганська", 12: "Львівська",
-    13: "Миколаївська", 14: "Одеська", 15: "Полтавська", 16: "Рівненська",
-    17: "Сумська", 18: "Тернопільська", 19: "Харківська", 20: "Херсонська",
-    21: "Хмельницька", 22: "Черкаська", 23: "Чернівецька", 24: "Чернігівська",
-    25: "Республіка Крим"
-}
+# Назви областей — з реєстру regions.csv, спільного з lab3
+area_map = area_names('UKR')
 
 def replace_area_indices(df, map):
     if 'area_ID' in df.columns:
@@ -64,18 +30,21 @@ def replace_area_indices(df, map):
     return df
 
 vhi_data = replace_area_indices(vhi_data, area_map)
+# Відсортовані дані з бінарним пошуком і передобчисленою статистикою (область, рік)
+vhi_index = VhiIndex(vhi_data)
 
-def analyze_vhi_data(df, area, year):
-    area_data = df[(df['area'] == area) & (df['year'] == year)]
-    if not area_data.empty:
+def analyze_vhi_data(index, area_id, year):
+    area = area_map[area_id]
+    stats = index.year_stats(area_id, year, 'VHI')
+    if stats is not None:
         print("#"*70)
         print(f"Область: {area}, Рік: {year}")
-        print(f"Мін VHI: {area_data['VHI'].min()}, Макс VHI: {area_data['VHI'].max()}, Серднє: {area_data['VHI'].mean()}, Медіана VHI: {area_data['VHI'].median()}")
+        print(f"Мін VHI: {stats['min']}, Макс VHI: {stats['max']}, Серднє: {stats['mean']}, Медіана VHI: {stats['median']}")
         print("#"*70)
     else:
         print(f"Нема інформації для {area} обл in {year}")
 
-def user_input_for_vhi(df):
+def user_input_for_vhi(index):
     print("#"*70)
     print("Доступні області:")
     for id, area in area_map.items():
@@ -88,12 +57,11 @@ def user_input_for_vhi(df):
         print("Невірний номер області.")
         return
     
-    area = area_map[area_id]
-    analyze_vhi_data(df, area, year)
+    analyze_vhi_data(index, area_id, year)
 
-user_input_for_vhi(vhi_data)
+user_input_for_vhi(vhi_index)
 
-def vhi_for_range(df):
+def vhi_for_range(index):
     print("Доступні області:")
     for id, area in area_map.items():
         print(f"{id}: {area}")
@@ -109,24 +77,23 @@ def vhi_for_range(df):
         print(f"Невірні області: {', '.join(map(str, invalid_area))}.")
         return
     
-    filtered_data = df[(df['area_ID'].isin(area_list)) & 
-                        (df['year'].between(start_year, end_year))]
+    area_frames = {a: index.select([a], (start_year, end_year)) for a in area_list}
 
     row_limit = 52 + ((end_year - start_year) * 52)
     
-    if not filtered_data.empty:
+    if any(len(f) for f in area_frames.values()):
         print("#"*70)
         for area_id in area_list:
             area_name = area_map[area_id]
             print(f"Ряд VHI для області {area_name} з {start_year} по {end_year}:")
-            area_data = filtered_data[filtered_data['area_ID'] == area_id]
+            area_data = area_frames[area_id]
             area_data_limited = area_data.head(row_limit)
             print(area_data_limited[['year', 'VHI']].to_string(index=False))
             print("#"*70)
     else:
         print(f"Немає даних для вказаних областей або років.")
 
-vhi_for_range(vhi_data)
+vhi_for_range(vhi_index)
 
 
 def find_extreme_droughts(df, map):
@@ -141,22 +108,25 @@ def find_extreme_droughts(df, map):
         print("\n Невірний формат числа. Спробуйте ще раз.\n")
         return
 
-    total_area = 25
-    threshold_area = max(1, int(total_area * percent / 100)) 
-    print(f"\n Шукаємо роки, коли більше {percent:.1f}% областей (тобто {threshold_area}+) постраждали від посухи (VHI < 15)...")
+    # Області рахуються за парою (країна, номер): номери в країнах повторюються
+    total_area = area_count(df)
+    threshold_area = min_affected(total_area, percent)
+    print(f"\n Шукаємо роки, коли більше {percent:.1f}% областей (тобто {threshold_area}+) постраждали від посухи "
+          f"(VHI < {DROUGHT_THRESHOLDS['extreme']}; пропущені значення VHI = -1 не враховуються)...")
     print("#" * 70)
 
-    drought_years = []
-    for year in sorted(df['year'].unique()):
-        year_data = df[df['year'] == year]
-        drought_area = year_data[year_data['VHI'] < 15]['area_ID'].unique()
+    # Один groupby по всіх роках і порогах замість маски на кожен рік
+    flags = drought_flags(df, DROUGHT_THRESHOLDS)
+    counts = affected_counts(flags)
+    areas = affected_areas(flags, 'extreme')
 
-        if len(drought_area) >= threshold_area:
-            affected_area = [map[r] for r in drought_area if r in map]
+    drought_years = []
+    for year, count in counts['extreme'].items():
+        if count >= threshold_area:
             drought_years.append({
                 'year': year,
-                'affected_count': len(drought_area),
-                'area': affected_area
+                'affected_count': int(count),
+                'area': [map[r] for r in areas[year] if r in map]
             })
 
     if drought_years:
@@ -168,4 +138,7 @@ def find_extreme_droughts(df, map):
     else:
         print("\n Посухи, що уразили більше зазначеного відсотка областей, не знайдено.")
 
-find_extreme_droughts(vhi_data, area_map)
\ No newline at end of file
+    print("\nЧутливість: кількість років за порогом уражених областей")
+    print(sensitivity_table(counts, total_area, range(10, 101, 10)).to_string())
+
+find_extreme_droughts(vhi_data, {(c, a): name for c in COUNTRIES for a, name in area_names(c).items()})
\ No newline at end of file
@@ -0,0 +1,109 @@
+import os
+import re
+import shutil
+import threading
+
+import pytest
+
+import vhi_stub_server
+from vhi_download import download_all, download_countries, load_manifest, parse_vhi_text, refresh_incremental
+from vhi_regions import REGISTRY_PATH, area_ids, load_registry
+
+AREAS = [1, 2, 3]
+_FILE_RE = re.compile(r"vhi_id_(\d+)_.*\.csv$")
+
+
+def noaa_files(directory):
+    # (область, шлях) для файлів NOAA; решта (кеш .vhi_cache.feather) пропускається
+    files = []
+    for filename in sorted(os.listdir(directory)):
+        match = _FILE_RE.match(filename)
+        if match:
+            files.append((int(match.group(1)), os.path.join(directory, filename)))
+    return files
+
+
+def truncate_copy(src_dir, dst_dir, last_year):
+    # Ті самі файли, але без років після last_year — "стан NOAA до оновлення"
+    os.makedirs(dst_dir, exist_ok=True)
+    for area_id, path in noaa_files(src_dir):
+        filename = os.path.basename(path)
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+        rows = [line for line in lines[2:] if line[:4].isdigit() and int(line[:4]) <= last_year]
+        with open(os.path.join(dst_dir, filename), "w", encoding="utf-8") as f:
+            f.writelines(lines[:2] + rows)
+
+
+def stored_weeks(directory):
+    # (область, рік, тиждень) з усіх файлів теки — так, як їх прочитає lab2
+    weeks = []
+    for area_id, path in noaa_files(directory):
+        with open(path, "r", encoding="utf-8") as f:
+            weeks += [(area_id,) + key for key in parse_vhi_text(f.read())[1]]
+    return weeks
+
+
+@pytest.fixture
+def stub_url():
+    servers = []
+
+    def start(directory):
+        server = vhi_stub_server.serve(directory, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}/get_TS_admin.php"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_download_refresh_download_has_no_duplicate_weeks(tmp_path, stub_url):
+    old_dir = tmp_path / "noaa_old"
+    truncate_copy(vhi_stub_server.DEFAULT_DIR, old_dir, 2022)
+    data_dir = str(tmp_path / "data")
+
+    # Перший запуск lab2 — дані до 2022 року
+    assert download_all(AREAS, data_dir, year1=1981, year2=2024, base_url=stub_url(str(old_dir)), workers=2) == []
+
+    # Нічне оновлення: у NOAA з'явилися 2023-2024 роки
+    full_url = stub_url(vhi_stub_server.DEFAULT_DIR)
+    report, failed = refresh_incremental(AREAS, data_dir, year2=2024, base_url=full_url, workers=2)
+    assert failed == []
+    assert all(report[a]["added"] for a in AREAS)
+
+    # Наступний запуск lab2 з тим самим діапазоном років
+    assert download_all(AREAS, data_dir, year1=1981, year2=2024, base_url=full_url, workers=2) == []
+
+    weeks = stored_weeks(data_dir)
+    assert len(weeks) == len(set(weeks))
+    expected = [w for w in stored_weeks(vhi_stub_server.DEFAULT_DIR) if w[0] in AREAS]
+    assert sorted(weeks) == sorted(expected)
+
+    # Один запис і один файл на область
+    manifest = load_manifest(data_dir)
+    assert sorted(manifest) == [str(a) for a in AREAS]
+    assert len(noaa_files(data_dir)) == len(AREAS)
+
+
+def test_new_country_is_discovered_and_registered(tmp_path, stub_url):
+    # Країни немає в regions.csv — provinceID шукаються в NOAA, реєстр — із заголовків
+    noaa_dir = tmp_path / "noaa_pol"
+    truncate_copy(vhi_stub_server.DEFAULT_DIR, noaa_dir, 1990)
+    for path in noaa_dir.iterdir():
+        if int(path.name.split("_")[2]) not in AREAS:
+            path.unlink()
+        else:
+            path.write_text(path.read_text(encoding="utf-8").replace(" UKR ", " POL ", 1), encoding="utf-8")
+    registry_path = str(tmp_path / "regions.csv")
+    shutil.copy(REGISTRY_PATH, registry_path)
+
+    failed = download_countries(["POL"], str(tmp_path / "data"), year2=1990,
+                                base_url=stub_url(str(noaa_dir)), registry_path=registry_path)
+    assert failed == {"POL": []}
+    registry = load_registry(registry_path)
+    assert area_ids("POL", registry) == AREAS
+    assert area_ids("UKR", registry) == area_ids("UKR")
+    assert sorted(load_manifest(str(tmp_path / "data" / "POL"))) == [str(a) for a in AREAS]
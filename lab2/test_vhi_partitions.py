@@ -0,0 +1,35 @@
+import pytest
+
+import vhi_stub_server
+from test_vhi_download import truncate_copy
+from vhi_data import load_partitions, load_vhi
+from vhi_droughts import affected_areas, area_count, drought_flags
+from vhi_query import VhiIndex
+
+
+@pytest.fixture
+def root(tmp_path):
+    # Два розділи з однаковими номерами областей: UKR і "POL" (копія з іншим заголовком)
+    truncate_copy(vhi_stub_server.DEFAULT_DIR, tmp_path / "UKR", 2024)
+    truncate_copy(vhi_stub_server.DEFAULT_DIR, tmp_path / "POL", 2024)
+    for path in (tmp_path / "POL").iterdir():
+        if int(path.name.split("_")[2]) > 3:
+            path.unlink()
+    return str(tmp_path)
+
+
+def test_partitions_are_keyed_by_country_and_area(root):
+    df = load_partitions(root, ["UKR", "POL"])
+    ukr = load_vhi(f"{root}/UKR")
+    assert not df.duplicated(["country", "area_ID", "year", "week"]).any()
+    assert len(df) == len(ukr) + (ukr["area_ID"].astype(int) <= 3).sum()
+    assert area_count(df) == 28
+
+    flags = drought_flags(df)
+    areas = [area for year_areas in affected_areas(flags, "extreme") for area in year_areas]
+    assert {country for country, _ in areas} <= {"UKR", "POL"}
+
+    with pytest.raises(ValueError):
+        VhiIndex(df)
+    index = VhiIndex(load_partitions(root, ["UKR"]))
+    assert index.area_ids == list(range(1, 26))
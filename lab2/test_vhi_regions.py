@@ -0,0 +1,44 @@
+import os
+
+from vhi_regions import area_names, load_registry, registry_from_headers
+
+NOAA_DIR = os.path.join(os.path.dirname(__file__), "..", "lab3", "csvfiles")
+
+# Транслітерація (КМУ 2010) — щоб порівняти українську назву з англійською назвою NOAA
+TRANSLIT = {
+    "а": "a", "б": "b", "в": "v", "г": "h", "ґ": "g", "д": "d", "е": "e", "є": "ie", "ж": "zh",
+    "з": "z", "и": "y", "і": "i", "ї": "i", "й": "i", "к": "k", "л": "l", "м": "m", "н": "n",
+    "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f", "х": "kh", "ц": "ts",
+    "ч": "ch", "ш": "sh", "щ": "shch", "ь": "", "ю": "iu", "я": "ia",
+}
+# Назви NOAA, що не є транслітерацією української
+EXONYMS = {"Crimea": "Республіка Крим", "Kiev": "Київська", "Kiev City": "м. Київ",
+           "Transcarpathia": "Закарпатська"}
+
+
+def transliterate(name):
+    return "".join(TRANSLIT.get(c, c) for c in name.lower())
+
+
+def test_shipped_registry_matches_noaa_headers():
+    # Номер області в regions.csv має означати ту саму область, що й "Province= N" у файлі NOAA
+    shipped = load_registry().set_index(["country", "area_ID"])
+    headers = registry_from_headers(NOAA_DIR).set_index(["country", "area_ID"])
+    assert len(headers) == 25
+
+    joined = headers[["noaa_name"]].join(shipped[["name", "noaa_name"]], rsuffix="_shipped", how="left")
+    mismatched = joined[joined["noaa_name"] != joined["noaa_name_shipped"]]
+    assert mismatched.empty, mismatched.to_string()
+
+    for (_, area_id), row in joined.iterrows():
+        if row["noaa_name"] in EXONYMS:
+            assert row["name"] == EXONYMS[row["noaa_name"]], (area_id, row["name"], row["noaa_name"])
+        else:
+            latin = transliterate(row["name"].removeprefix("м. "))
+            noaa = row["noaa_name"].lower().replace("'", "")
+            assert latin[:3] == noaa[:3], (area_id, row["name"], row["noaa_name"])
+
+
+def test_ukrainian_names_are_unique():
+    names = list(area_names("UKR").values())
+    assert all(names) and len(set(names)) == len(names)
@@ -0,0 +1,154 @@
+import hashlib
+import io
+import os
+import re
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = feather = None
+
+CACHE_NAME = ".vhi_cache.feather"
+INDEX_COLS = ["SMN", "SMT", "VCI", "TCI", "VHI"]
+_TAG_RE = re.compile(r"<.*?>")
+_FILE_RE = re.compile(r"vhi_id_(\d+)_.*\.csv$")
+
+
+def list_vhi_files(directory):
+    files = []
+    for filename in sorted(os.listdir(directory)):
+        if not (filename.startswith("vhi_id_") and filename.endswith(".csv")):
+            continue
+        match = _FILE_RE.match(filename)
+        if not match:
+            print(f"Невірний формат імені файлу: {filename}. Пропускаємо.")
+            continue
+        files.append((int(match.group(1)), os.path.join(directory, filename)))
+    return files
+
+
+def source_signature(files):
+    h = hashlib.sha1()
+    for area_id, path in files:
+        st = os.stat(path)
+        h.update(f"{area_id}|{os.path.basename(path)}|{st.st_size}|{st.st_mtime_ns}\n".encode())
+    return h.hexdigest()
+
+
+def parse_vhi_file(filepath, area_id):
+    # Теги NOAA (<tt><pre>, <br>) прибираємо в пам'яті, файл на диску не змінюємо
+    with open(filepath, "r", encoding="utf-8") as f:
+        text = _TAG_RE.sub("", f.read())
+    df = pd.read_csv(io.StringIO(text), index_col=False, header=1)
+    df.columns = df.columns.str.strip()
+    df["year"] = pd.to_numeric(df["year"].astype(str).str.extract(r"(\d+)", expand=False), errors="coerce")
+    df = df.dropna(subset=["year"])
+    df["area_ID"] = area_id
+    return df
+
+
+def to_typed(df):
+    df = df[["year", "week"] + INDEX_COLS + ["area_ID"]].copy()
+    df["year"] = df["year"].astype("int16")
+    df["week"] = df["week"].astype("int16")
+    df[INDEX_COLS] = df[INDEX_COLS].astype("float32")
+    df["area_ID"] = df["area_ID"].astype("category")
+    return df.reset_index(drop=True)
+
+
+def parse_vhi_dir(files):
+    frames = []
+    for area_id, path in files:
+        try:
+            frames.append(parse_vhi_file(path, area_id))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Помилка при зчитуванні файлу {os.path.basename(path)}: {e}")
+    if not frames:
+        return pd.DataFrame(columns=["year", "week"] + INDEX_COLS + ["area_ID"])
+    return to_typed(pd.concat(frames, ignore_index=True))
+
+
+def _read_cache(cache_path, signature):
+    if feather is None or not os.path.exists(cache_path):
+        return None
+    try:
+        # memory_map: числові колонки без пропусків беруться з файлу без копіювання
+        table = feather.read_table(cache_path, memory_map=True)
+    except (OSError, pa.ArrowException):
+        return None
+    meta = table.schema.metadata or {}
+    if meta.get(b"vhi_signature", b"").decode() != signature:
+        return None
+    return table.to_pandas(split_blocks=True)
+
+
+def _write_cache(df, cache_path, signature):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    meta = dict(table.schema.metadata or {})
+    meta[b"vhi_signature"] = signature.encode()
+    table = table.replace_schema_metadata(meta)
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    tmp_path = cache_path + ".tmp"
+    # Без стиснення, інакше memory_map при читанні не працює
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, cache_path)
+
+
+def load_vhi(directory, cache_path=None):
+    files = list_vhi_files(directory)
+    signature = source_signature(files)
+    cache_path = cache_path or os.path.join(directory, CACHE_NAME)
+
+    df = _read_cache(cache_path, signature)
+    if df is not None:
+        return df
+
+    df = parse_vhi_dir(files)
+    if feather is not None and files:
+        try:
+            _write_cache(df, cache_path, signature)
+        except OSError as e:
+            print(f"Не вдалося записати кеш {cache_path}: {e}")
+    return df
+
+
+# === Розбиття за країнами: root/<country>/vhi_id_*.csv, кеш root/country=<country>/vhi.feather ===
+def country_dir(root, country):
+    return os.path.join(root, country)
+
+
+def partition_cache_path(cache_root, country):
+    return os.path.join(cache_root, f"country={country}", "vhi.feather")
+
+
+def area_key(df):
+    # Номери областей NOAA повторюються в різних країнах: у фреймі з розділів
+    # область — це пара (country, area_ID), у фреймі однієї теки — area_ID
+    return ["country", "area_ID"] if "country" in df.columns else ["area_ID"]
+
+
+def load_partitions(root, countries, cache_root=None):
+    # Читаються лише розділи країн із запиту: пам'ять і час старту залежать
+    # від запиту, а не від кількості завантажених країн
+    cache_root = cache_root or root
+    frames = []
+    for country in countries:
+        directory = country_dir(root, country)
+        if not os.path.isdir(directory):
+            print(f"Немає даних для країни {country}: {directory}")
+            continue
+        df = load_vhi(directory, partition_cache_path(cache_root, country))
+        df.insert(0, "country", country)
+        frames.append(df)
+
+    if not frames:
+        df = parse_vhi_dir([])
+        df.insert(0, "country", pd.Series(dtype="category"))
+        return df
+    df = pd.concat(frames, ignore_index=True)
+    df["country"] = df["country"].astype("category")
+    df["area_ID"] = df["area_ID"].astype(int).astype("category")
+    return df.sort_values(["country", "area_ID", "year", "week"], kind="stable").reset_index(drop=True)
@@ -0,0 +1,356 @@
+import argparse
+import http.client
+import json
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime as dt
+from urllib.parse import urlencode, urlsplit
+
+import pandas as pd
+
+from vhi_regions import REGISTRY_COLUMNS, REGISTRY_PATH, area_ids, extend_registry, load_registry, parse_header
+
+BASE_URL = "https://www.star.nesdis.noaa.gov/smcd/emb/vci/VH/get_TS_admin.php"
+MANIFEST_NAME = "vhi_manifest.json"
+
+# Одне з'єднання на потік: keep-alive замість нового TCP/TLS на кожну область
+_local = threading.local()
+_manifest_lock = threading.Lock()
+
+
+def build_url(area_id, year1, year2, country="UKR", base_url=BASE_URL):
+    query = urlencode({
+        "country": country,
+        "provinceID": area_id,
+        "year1": year1,
+        "year2": year2,
+        "type": "Mean",
+    })
+    return f"{base_url}?{query}"
+
+
+def manifest_key(area_id):
+    # Один запис на область; покритий діапазон років — у полях year1/year2 запису
+    return str(area_id)
+
+
+def load_manifest(directory):
+    path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        print(f"Маніфест {path} пошкоджено, починаємо з чистого.")
+        return {}
+
+
+def save_manifest(directory, manifest):
+    path = os.path.join(directory, MANIFEST_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _get_connection(scheme, netloc, timeout):
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get((scheme, netloc))
+    if conn is None:
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        conn = conns[(scheme, netloc)] = cls(netloc, timeout=timeout)
+    return conn
+
+
+def _drop_connection(scheme, netloc):
+    conn = getattr(_local, "conns", {}).pop((scheme, netloc), None)
+    if conn is not None:
+        conn.close()
+
+
+def fetch(url, retries=3, backoff=0.5, timeout=30):
+    parts = urlsplit(url)
+    path = parts.path + ("?" + parts.query if parts.query else "")
+    for attempt in range(retries + 1):
+        try:
+            conn = _get_connection(parts.scheme, parts.netloc, timeout)
+            conn.request("GET", path, headers={"Connection": "keep-alive"})
+            resp = conn.getresponse()
+            body = resp.read()
+            if resp.status == 200:
+                return body
+            if resp.status < 500 and resp.status != 429:
+                raise RuntimeError(f"HTTP {resp.status} для {url}")
+            error = RuntimeError(f"HTTP {resp.status} для {url}")
+        except (OSError, http.client.HTTPException) as e:
+            # Розірване keep-alive з'єднання — відкриваємо нове при наступній спробі
+            _drop_connection(parts.scheme, parts.netloc)
+            error = e
+        if attempt < retries:
+            time.sleep(backoff * (2 ** attempt) * (1 + random.random()))
+    raise error
+
+
+def _write_atomic(filepath, body):
+    tmp_path = filepath + ".part"
+    with open(tmp_path, "wb") as out:
+        out.write(body)
+    os.replace(tmp_path, filepath)
+
+
+def download_area(area_id, directory, year1, year2, country="UKR", base_url=BASE_URL,
+                  retries=3, backoff=0.5, timeout=30):
+    url = build_url(area_id, year1, year2, country=country, base_url=base_url)
+    body = fetch(url, retries=retries, backoff=backoff, timeout=timeout)
+    stamp = dt.now().strftime("%d%m%Y%H%M%S")
+    filename = f"vhi_id_{area_id}_{stamp}.csv"
+    # Не перезаписуємо файл, що ще значиться в маніфесті (два завантаження за секунду)
+    n = 1
+    while os.path.exists(os.path.join(directory, filename)):
+        filename = f"vhi_id_{area_id}_{stamp}_{n}.csv"
+        n += 1
+    _write_atomic(os.path.join(directory, filename), body)
+    return filename, len(body)
+
+
+def covers(entry, year1, year2):
+    return entry["year1"] <= year1 and entry["year2"] >= year2
+
+
+def store_area_entry(manifest, directory, area_id, entry):
+    # Попередній файл області, якщо це не той самий файл, видаляється —
+    # інакше load_vhi прочитає обидва і рядки області задвояться
+    old = manifest.get(manifest_key(area_id))
+    if old and old["file"] != entry["file"]:
+        old_path = os.path.join(directory, old["file"])
+        if os.path.exists(old_path):
+            os.remove(old_path)
+    manifest[manifest_key(area_id)] = entry
+
+
+def download_all(area_ids, directory, year1=1981, year2=2024, country="UKR", base_url=BASE_URL,
+                 workers=8, retries=3, backoff=0.5, timeout=30, force=False):
+    os.makedirs(directory, exist_ok=True)
+    manifest = load_manifest(directory)
+
+    pending = []
+    for area_id in area_ids:
+        # Запис шукаємо за областю, а не за діапазоном років: після --incremental
+        # ряд уже довший за запитаний і повторно завантажувати його не треба
+        entry = manifest.get(manifest_key(area_id))
+        if not force and entry and covers(entry, year1, year2) \
+                and os.path.exists(os.path.join(directory, entry["file"])):
+            print(f"Файл для області {area_id} вже існує: {entry['file']}. Пропускаємо завантаження.")
+            continue
+        pending.append(area_id)
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(pending) or 1))) as pool:
+        futures = {
+            pool.submit(download_area, area_id, directory, year1, year2, country, base_url,
+                        retries, backoff, timeout): area_id
+            for area_id in pending
+        }
+        for future in as_completed(futures):
+            area_id = futures[future]
+            try:
+                filename, size = future.result()
+            except Exception as e:
+                failed.append(area_id)
+                print(f"Помилка для області {area_id}: {e}")
+                continue
+
+            with _manifest_lock:
+                store_area_entry(manifest, directory, area_id, {
+                    "file": filename,
+                    "year1": year1,
+                    "year2": year2,
+                    "bytes": size,
+                    "downloaded": dt.now().isoformat(timespec="seconds"),
+                })
+                # Зберігаємо після кожної області, щоб перерваний запуск можна було продовжити
+                save_manifest(directory, manifest)
+            print(f"VHI дата для області {area_id} завантажена/збережена у {filename}")
+
+    return failed
+
+
+# === Інкрементальне оновлення: завантажуємо лише хвіст ряду ===
+_TAG_RE = re.compile(r"<.*?>")
+
+
+def parse_vhi_text(text):
+    header, rows = [], {}
+    for line in text.splitlines():
+        line = _TAG_RE.sub("", line).rstrip()
+        if not line:
+            continue
+        values = [v.strip() for v in line.split(",") if v.strip()]
+        if len(values) < 7 or not values[0].isdigit():
+            if not rows and len(header) < 2:
+                header.append(line)
+            continue
+        rows[(int(values[0]), int(values[1]))] = tuple(float(v) for v in values[2:7])
+    return header, rows
+
+
+def format_vhi_row(key, numbers):
+    year, week = key
+    smn, smt, vci, tci, vhi = numbers
+    return f"{year},{week:2d}, {smn:.3f},{smt:.2f},{vci:6.2f},{tci:6.2f},{vhi:6.2f},"
+
+
+def merge_rows(old_rows, new_rows):
+    added = sorted(k for k in new_rows if k not in old_rows)
+    revised = sorted(k for k in new_rows if k in old_rows and old_rows[k] != new_rows[k])
+    merged = dict(old_rows)
+    merged.update(new_rows)
+    return merged, added, revised
+
+
+def refresh_area(area_id, directory, entry, revision_weeks=4, year2=None, country="UKR",
+                 base_url=BASE_URL, retries=3, backoff=0.5, timeout=30):
+    filepath = os.path.join(directory, entry["file"])
+    with open(filepath, "r", encoding="utf-8") as f:
+        header, old_rows = parse_vhi_text(f.read())
+
+    last_year, last_week = max(old_rows) if old_rows else (1981, 1)
+    # Перезапитуємо кілька останніх тижнів, бо NOAA їх іноді переглядає
+    start_year = last_year - 1 if last_week <= revision_weeks else last_year
+    year2 = year2 or dt.now().year
+    url = build_url(area_id, start_year, year2, country=country, base_url=base_url)
+    body = fetch(url, retries=retries, backoff=backoff, timeout=timeout)
+    _, new_rows = parse_vhi_text(body.decode("utf-8", errors="replace"))
+
+    merged, added, revised = merge_rows(old_rows, new_rows)
+    if added or revised:
+        lines = header + [format_vhi_row(k, merged[k]) for k in sorted(merged)]
+        _write_atomic(filepath, ("\n".join(lines) + "\n").encode("utf-8"))
+    return added, revised, len(body)
+
+
+def refresh_incremental(area_ids, directory, revision_weeks=4, year1=1981, year2=None,
+                        country="UKR", base_url=BASE_URL, workers=8, retries=3, backoff=0.5, timeout=30):
+    manifest = load_manifest(directory)
+    missing, jobs = [], {}
+    for area_id in area_ids:
+        entry = manifest.get(manifest_key(area_id))
+        if entry is None or not os.path.exists(os.path.join(directory, entry["file"])):
+            missing.append(area_id)
+        else:
+            jobs[area_id] = entry
+
+    # Областей без локального ряду ще немає — для них повне завантаження
+    failed = download_all(missing, directory, year1=year1, year2=year2 or dt.now().year, country=country,
+                          base_url=base_url, workers=workers, retries=retries, backoff=backoff,
+                          timeout=timeout) if missing else []
+
+    report = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(jobs) or 1))) as pool:
+        futures = {
+            pool.submit(refresh_area, area_id, directory, entry, revision_weeks, year2, country,
+                        base_url, retries, backoff, timeout): area_id
+            for area_id, entry in jobs.items()
+        }
+        for future in as_completed(futures):
+            area_id = futures[future]
+            try:
+                added, revised, size = future.result()
+            except Exception as e:
+                failed.append(area_id)
+                print(f"Помилка для області {area_id}: {e}")
+                continue
+
+            entry = jobs[area_id]
+            if added:
+                # Файл дописано на місці: той самий запис і файл, лише ширший діапазон років
+                with _manifest_lock:
+                    store_area_entry(manifest, directory, area_id, dict(
+                        entry, year2=max(entry["year2"], added[-1][0]),
+                        bytes=entry.get("bytes", 0) + size,
+                        downloaded=dt.now().isoformat(timespec="seconds")))
+                    save_manifest(directory, manifest)
+            report[area_id] = {"added": added, "revised": revised, "bytes": size}
+            print(f"Область {area_id}: нових тижнів {len(added)}, переглянутих {len(revised)}, "
+                  f"завантажено {size} байт")
+            for year, week in revised:
+                print(f"  Перегляд даних: {year}-W{week}")
+    return report, failed
+
+
+# === Нові країни: provinceID з відповідей NOAA ===
+def discover_areas(country, year=2000, max_missing=3, base_url=BASE_URL, retries=3, backoff=0.5, timeout=30):
+    # NOAA не публікує список provinceID країни: номери перебираються з 1 запитами
+    # за один рік, доки max_missing поспіль не дадуть порожньої відповіді (без
+    # заголовка "Mean data for <country> Province= N: ..." або HTTP 4xx).
+    # Рядки реєстру — з тих самих заголовків
+    rows, missing, area_id = [], 0, 0
+    while missing < max_missing:
+        area_id += 1
+        try:
+            body = fetch(build_url(area_id, year, year, country=country, base_url=base_url),
+                         retries=retries, backoff=backoff, timeout=timeout)
+        except RuntimeError:
+            body = b""
+        row = parse_header(body.decode("utf-8", errors="replace"))
+        if row is None or row["country"] != country:
+            missing += 1
+            continue
+        missing = 0
+        rows.append(row)
+    return pd.DataFrame(rows, columns=REGISTRY_COLUMNS)
+
+
+def download_countries(countries, root, year1=1981, year2=2024, base_url=BASE_URL, workers=8,
+                       retries=3, backoff=0.5, timeout=30, incremental=False, revision_weeks=4,
+                       registry_path=REGISTRY_PATH):
+    # Кожна країна — окремий розділ root/<country> зі своїм маніфестом. Країни,
+    # якої ще немає в реєстрі, спершу шукаються в NOAA і дописуються в regions.csv
+    failed = {}
+    for country in countries:
+        directory = os.path.join(root, country)
+        ids = area_ids(country, load_registry(registry_path))
+        if not ids:
+            found = discover_areas(country, base_url=base_url, retries=retries, backoff=backoff, timeout=timeout)
+            if found.empty:
+                print(f"NOAA не має областей для країни {country}")
+                continue
+            ids = area_ids(country, extend_registry(found, registry_path))
+            print(f"Країна {country}: знайдено {len(ids)} областей, додано в {registry_path}")
+        if incremental:
+            _, failed[country] = refresh_incremental(ids, directory, revision_weeks, year1=year1, country=country,
+                                                     base_url=base_url, workers=workers, retries=retries,
+                                                     backoff=backoff, timeout=timeout)
+        else:
+            failed[country] = download_all(ids, directory, year1=year1, year2=year2, country=country,
+                                           base_url=base_url, workers=workers, retries=retries,
+                                           backoff=backoff, timeout=timeout)
+    return failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Завантаження рядів VHI з NOAA")
+    parser.add_argument("--dir", default=".")
+    parser.add_argument("--incremental", action="store_true", help="завантажити лише нові тижні")
+    parser.add_argument("--revision-weeks", type=int, default=4)
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--countries", nargs="+",
+                        help="коди країн NOAA (нові додаються в regions.csv); дані кладуться в --dir/<країна>")
+    args = parser.parse_args()
+
+    if args.countries:
+        download_countries(args.countries, args.dir, base_url=args.base_url, workers=args.workers,
+                           incremental=args.incremental, revision_weeks=args.revision_weeks)
+    elif args.incremental:
+        refresh_incremental(area_ids("UKR"), args.dir, revision_weeks=args.revision_weeks,
+                            base_url=args.base_url, workers=args.workers)
+    else:
+        download_all(area_ids("UKR"), args.dir, base_url=args.base_url, workers=args.workers)
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from vhi_data import area_key
+
+DROUGHT_THRESHOLDS = {"extreme": 15, "moderate": 35}
+
+# Тижні NOAA 1..52 -> сезон
+_SEASON_OF_WEEK = np.array(
+    [""] + ["зима"] * 9 + ["весна"] * 13 + ["літо"] * 13 + ["осінь"] * 13 + ["зима"] * 4,
+    dtype=object,
+)
+
+
+def min_affected(total_areas, percent):
+    return max(1, int(total_areas * percent / 100))
+
+
+def drought_flags(df, thresholds=DROUGHT_THRESHOLDS, window=None):
+    # Один прохід: для кожного порогу — чи була в області хоч один тиждень
+    # з VHI нижче порогу у межах (рік[, вікно]). VHI = -1 у NOAA — пропуск, не посуха
+    vhi = df["VHI"].to_numpy()
+    valid = vhi >= 0
+    keys = {"year": df["year"].to_numpy()}
+    if window == "season":
+        keys["season"] = _SEASON_OF_WEEK[np.clip(df["week"].to_numpy(), 0, 52)]
+    elif window == "week":
+        keys["week"] = df["week"].to_numpy()
+    elif window is not None:
+        raise ValueError(f"Невідоме вікно: {window}")
+    for name in area_key(df):
+        keys[name] = df[name].to_numpy()
+
+    hits = pd.DataFrame(keys)
+    for name, limit in thresholds.items():
+        hits[name] = valid & (vhi < limit)
+    return hits.groupby(list(keys), sort=True).any()
+
+
+def _period_levels(flags):
+    return [name for name in flags.index.names if name not in ("country", "area_ID")]
+
+
+def area_count(df):
+    return len(df[area_key(df)].drop_duplicates())
+
+
+def affected_counts(flags):
+    return flags.groupby(level=_period_levels(flags)).sum()
+
+
+def affected_areas(flags, threshold):
+    # Списки area_ID, а для фрейму з розділів — пар (country, area_ID)
+    hit = flags[threshold]
+    hit = hit[hit].reset_index()
+    area = [name for name in flags.index.names if name in ("country", "area_ID")]
+    hit["area"] = list(zip(*(hit[name] for name in area))) if len(area) > 1 else hit["area_ID"]
+    return hit.groupby(_period_levels(flags))["area"].agg(list)
+
+
+def sensitivity_table(counts, total_areas, percents):
+    # counts: (періоди x пороги); результат — кількість періодів, де уражено
+    # не менше min_affected(percent) областей, для всієї сітки відсотків одразу
+    percents = np.asarray(percents, dtype=float)
+    need = np.maximum(1, (total_areas * percents / 100).astype(int))
+    hits = (counts.to_numpy()[None, :, :] >= need[:, None, None]).sum(axis=1)
+    return pd.DataFrame(hits, index=pd.Index(percents, name="percent"), columns=counts.columns)
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+STAT_COLS = ["VHI", "VCI", "TCI"]
+STAT_FUNCS = ["min", "max", "mean", "median"]
+_YEAR_SPAN = 10000
+
+
+class VhiIndex:
+    # Дані впорядковані за (area_ID, year, week); ключ area_ID * 10000 + year
+    # монотонний, тому будь-яка пара (область, рік) чи діапазон років — це
+    # неперервний зріз, який знаходиться бінарним пошуком
+    def __init__(self, df):
+        if "country" in df.columns and df["country"].nunique() > 1:
+            raise ValueError("VhiIndex будується для однієї країни: номери областей у країнах повторюються")
+        df = df.sort_values(["area_ID", "year", "week"], kind="stable").reset_index(drop=True)
+        self.df = df
+        area = df["area_ID"].to_numpy(dtype=np.int64)
+        self._keys = area * _YEAR_SPAN + df["year"].to_numpy(dtype=np.int64)
+        self._weeks = df["week"].to_numpy()
+        self.area_ids = sorted(int(a) for a in pd.unique(area))
+        self.years = (int(df["year"].min()), int(df["year"].max())) if len(df) else (0, 0)
+        # float32 -> float64 з округленням до точності джерела (2 знаки), щоб 17.77 не ставало 17.770000457
+        values = df[STAT_COLS].astype("float64").round(2)
+        values[["area_ID", "year"]] = df[["area_ID", "year"]]
+        self.stats = values.groupby(["area_ID", "year"], observed=True)[STAT_COLS].agg(STAT_FUNCS)
+
+    def _bounds(self, area_id, year1, year2):
+        lo = np.searchsorted(self._keys, area_id * _YEAR_SPAN + year1, side="left")
+        hi = np.searchsorted(self._keys, area_id * _YEAR_SPAN + year2, side="right")
+        return lo, hi
+
+    def _positions(self, area_ids, year_range=None, week_range=None):
+        year1, year2 = year_range or self.years
+        parts = []
+        for area_id in area_ids:
+            lo, hi = self._bounds(int(area_id), year1, year2)
+            if lo == hi:
+                continue
+            pos = np.arange(lo, hi)
+            if week_range is not None:
+                weeks = self._weeks[lo:hi]
+                pos = pos[(weeks >= week_range[0]) & (weeks <= week_range[1])]
+            parts.append(pos)
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def area_year(self, area_id, year):
+        lo, hi = self._bounds(int(area_id), year, year)
+        return self.df.iloc[lo:hi]
+
+    def select(self, area_ids=None, year_range=None, week_range=None):
+        area_ids = self.area_ids if area_ids is None else area_ids
+        if len(area_ids) == 1 and week_range is None:
+            lo, hi = self._bounds(int(area_ids[0]), *(year_range or self.years))
+            return self.df.iloc[lo:hi]
+        return self.df.iloc[self._positions(area_ids, year_range, week_range)]
+
+    def year_stats(self, area_id, year, column="VHI"):
+        try:
+            row = self.stats.loc[(area_id, year), column]
+        except KeyError:
+            return None
+        return row.to_dict()
@@ -0,0 +1,65 @@
+import os
+import re
+
+import pandas as pd
+
+REGISTRY_PATH = os.path.join(os.path.dirname(__file__), "regions.csv")
+REGISTRY_COLUMNS = ["country", "area_ID", "name", "noaa_name"]
+_HEADER_RE = re.compile(r"Mean data for\s+(\w+)\s+Province=\s*(\d+):\s*([^,]+),")
+
+_registry_cache = {}
+
+
+def load_registry(path=REGISTRY_PATH):
+    # Реєстр областей: country, area_ID, name, noaa_name — замість словників у коді
+    if path not in _registry_cache:
+        _registry_cache[path] = pd.read_csv(path, dtype={"country": str, "area_ID": int, "name": str,
+                                                         "noaa_name": str}, keep_default_na=False)
+    return _registry_cache[path]
+
+
+def countries(registry=None):
+    registry = load_registry() if registry is None else registry
+    return sorted(registry["country"].unique())
+
+
+def area_names(country="UKR", registry=None):
+    registry = load_registry() if registry is None else registry
+    rows = registry[registry["country"] == country]
+    return dict(zip(map(int, rows["area_ID"]), rows["name"]))
+
+
+def area_ids(country="UKR", registry=None):
+    return sorted(area_names(country, registry))
+
+
+def parse_header(text):
+    # Рядок реєстру із заголовка "Mean data for UKR Province= 1: Cherkasy, ..." або None;
+    # українська назва — поки що назва NOAA, її виправляють у regions.csv вручну
+    match = _HEADER_RE.search(text)
+    if match is None:
+        return None
+    country, area_id, noaa_name = match.groups()
+    return {"country": country, "area_ID": int(area_id), "name": noaa_name.strip(),
+            "noaa_name": noaa_name.strip()}
+
+
+def registry_from_headers(directory):
+    # Реєстр із заголовків уже завантажених файлів NOAA
+    rows = []
+    for filename in sorted(os.listdir(directory)):
+        if not (filename.startswith("vhi_id_") and filename.endswith(".csv")):
+            continue
+        with open(os.path.join(directory, filename), "r", encoding="utf-8", errors="replace") as f:
+            row = parse_header(f.readline())
+        if row:
+            rows.append(row)
+    return pd.DataFrame(rows, columns=REGISTRY_COLUMNS)
+
+
+def extend_registry(rows, path=REGISTRY_PATH):
+    # Дописує нові області в кінець реєстру (той самий формат із CRLF)
+    rows = pd.DataFrame(rows, columns=REGISTRY_COLUMNS)
+    rows.to_csv(path, mode="a", header=False, index=False, lineterminator="\r\n")
+    _registry_cache.pop(path, None)
+    return load_registry(path)
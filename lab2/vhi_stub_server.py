@@ -0,0 +1,77 @@
+import argparse
+import os
+import re
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+from vhi_regions import parse_header
+
+# Локальна заміна get_TS_admin.php: віддає CSV з lab3/csvfiles,
+# щоб перевіряти завантажувач без доступу до NOAA
+DEFAULT_DIR = os.path.join(os.path.dirname(__file__), "..", "lab3", "csvfiles")
+
+
+def find_area_files(directory):
+    # (країна із заголовка, номер області) -> файл
+    files = {}
+    for filename in os.listdir(directory):
+        match = re.match(r"vhi_id_(\d+)_.*\.csv$", filename)
+        if match:
+            path = os.path.join(directory, filename)
+            with open(path, "r", encoding="utf-8") as f:
+                header = parse_header(f.readline())
+            country = header["country"] if header else "UKR"
+            files[(country, int(match.group(1)))] = path
+    return files
+
+
+def make_handler(directory):
+    area_files = find_area_files(directory)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            params = parse_qs(urlsplit(self.path).query)
+            try:
+                area_id = int(params["provinceID"][0])
+                country = params.get("country", ["UKR"])[0]
+                year1 = int(params.get("year1", ["0"])[0])
+                year2 = int(params.get("year2", ["9999"])[0])
+            except (KeyError, ValueError):
+                return self._send(400, b"bad request")
+            if (country, area_id) not in area_files:
+                return self._send(404, b"not found")
+
+            with open(area_files[(country, area_id)], "r", encoding="utf-8") as f:
+                lines = f.readlines()
+            rows = [line for line in lines[2:]
+                    if line[:4].isdigit() and year1 <= int(line[:4]) <= year2]
+            self._send(200, "".join(lines[:2] + rows).encode("utf-8"))
+
+        def _send(self, status, body):
+            self.send_response(status)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve(directory=DEFAULT_DIR, host="127.0.0.1", port=8000):
+    server = ThreadingHTTPServer((host, port), make_handler(directory))
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", default=DEFAULT_DIR)
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    server = serve(args.dir, port=args.port)
+    print(f"Сервер: http://127.0.0.1:{args.port}/get_TS_admin.php")
+    server.serve_forever()
@@ -1,18 +1,20 @@
 import streamlit as st
-import pandas as pd
 import matplotlib.pyplot as plt
 import os
-import re
-
-area_dict = {
-    1: "Вінницька", 2: "Волинська", 3: "Дніпропетровська", 4: "Донецька",
-    5: "Житомирська", 6: "Закарпатська", 7: "Запорізька", 8: "Івано-Франківська",
-    9: "Київська", 10: "Кіровоградська", 11: "Луганська", 12: "Львівська",
-    13: "Миколаївська", 14: "Одеська", 15: "Полтавська", 16: "Рівненська",
-    17: "Сумська", 18: "Тернопільська", 19: "Харківська", 20: "Херсонська",
-    21: "Хмельницька", 22: "Черкаська", 23: "Чернівецька", 24: "Чернігівська",
-    25: "Республіка Крим"
-}
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lab2'))
+from vhi_data import load_vhi, list_vhi_files, source_signature
+from vhi_query import VhiIndex
+from vhi_regions import area_names
+from vhi_timeseries import AGGREGATIONS, DOWNSAMPLERS, prepare_plot_series
+from vhi_cube import ComparisonCube
+
+MAX_PLOT_POINTS = 500
+# None — середнє, інакше перцентиль з гістограмних ескізів куба
+COMPARISON_STATS = {"Середнє": None, "Медіана": 50, "P10": 10, "P90": 90}
+
+area_dict = area_names('UKR')
 
 area_name_to_id = {v: k for k, v in area_dict.items()}
 
@@ -30,33 +32,35 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+@st.cache_data(show_spinner=False, max_entries=1)
+def _load_vhi_cached(directory, signature):
+    return load_vhi(directory)
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _load_vhi_index(directory, signature):
+    # Індекс спільний для всіх сесій і лише читається, тому cache_resource без копій
+    return VhiIndex(_load_vhi_cached(directory, signature))
+
+
 def read_vhi_from_csv(directory):
-    data_frames = []
-    for filename in os.listdir(directory):
-        if filename.startswith('vhi_id_') and filename.endswith('.csv'):
-            filepath = os.path.join(directory, filename)
-            try:
-                area_id = int(filename.split('_')[2])
-            except (IndexError, ValueError):
-                print(f"Невірний формат імені файлу: {filename}. Видаляємо файл.")
-                os.remove(filepath)
-                continue
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    cleaned_lines = [re.sub(r'<.*?>', '', line) for line in f]
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.writelines(cleaned_lines)
-
-                df = pd.read_csv(filepath, index_col=False, header=1)
-                df.columns = df.columns.str.strip()
-                df['area_ID'] = area_id
-                data_frames.append(df)
-            except Exception as e:
-                print(f"Помилка при зчитуванні файлу {filename}: {e}")
-    return pd.concat(data_frames, ignore_index=True) if data_frames else pd.DataFrame()
+    # Streamlit перевиконує скрипт на кожну дію з віджетом: ключ кешу — підпис
+    # вмісту каталогу (імена, розміри, mtime), тож розбір відбувається лише
+    # при зміні файлів. Теги прибираються в пам'яті, CSV на диску не змінюються
+    signature = source_signature(list_vhi_files(directory))
+    return _load_vhi_index(directory, signature)
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _load_comparison_cube(directory, signature):
+    return ComparisonCube(_load_vhi_cached(directory, signature))
+
+
+def read_comparison_cube(directory):
+    return _load_comparison_cube(directory, source_signature(list_vhi_files(directory)))
 
 directory = os.path.join(os.path.dirname(__file__), 'csvfiles')
-df = read_vhi_from_csv(directory)
+vhi_index = read_vhi_from_csv(directory)
 
 default_state = {
     "selected_index": "VCI",
@@ -65,6 +69,9 @@ default_state = {
     "year_range": (1982, 2024),
     "ascending": False,
     "descending": False,
+    "aggregation": "Тиждень",
+    "downsample": "LTTB",
+    "comparison_stat": "Середнє",
 }
 
 if st.session_state.get("reset_filters", False):
@@ -81,7 +88,7 @@ for key, value in default_state.items():
 
 
 vhi_options = ["VCI", "TCI", "VHI"]
-available_area_names = [area_dict[aid] for aid in sorted(df['area_ID'].unique())]
+available_area_names = [area_dict[aid] for aid in vhi_index.area_ids]
 
 col1, col2 = st.columns([1, 2])
 
@@ -109,11 +116,8 @@ with col1:
     
 
 
-filtered_df = df[
-    (df['area_ID'] == selected_area) &
-    (df['week'].between(*week_range)) &
-    (df['year'].between(*year_range))
-]
+filtered_df = vhi_index.select([selected_area], year_range, week_range)
+series_df = filtered_df
 
 
 if ascending:
@@ -130,35 +134,42 @@ with col2:
 
     with tab2:
         st.subheader(f"Динаміка {selected_index} по області {selected_area_name}")
+        agg_col, ds_col = st.columns(2)
+        aggregation = agg_col.selectbox("Агрегація", options=list(AGGREGATIONS), key="aggregation")
+        downsample = ds_col.selectbox("Проріджування", options=list(DOWNSAMPLERS), key="downsample")
+
+        # Агрегація і проріджування до MAX_PLOT_POINTS виконуються до малювання,
+        # тож час рендеру не залежить від ширини обраного інтервалу
+        series = prepare_plot_series(series_df, selected_index, aggregation, downsample, MAX_PLOT_POINTS)
         fig, ax = plt.subplots()
-        x_labels = filtered_df['year'].astype(str) + "-W" + filtered_df['week'].astype(int).astype(str)
-        ax.plot(x_labels, filtered_df[selected_index], marker='o', linestyle='-')
-        ax.set_xlabel("Тиждень")
+        ax.plot(series.index, series.to_numpy(), marker='o' if len(series) <= 60 else None, linestyle='-')
+        ax.set_xlabel("Дата")
         ax.set_ylabel(selected_index)
-        ax.tick_params(axis='x', labelrotation=45)
-        
-        if len(x_labels) > 20:
-            ax.set_xticks([])
-            st.info("Підписи на осі X приховано, оскільки їх більше 20")
-        else:
-            ax.set_xticklabels(x_labels, rotation=45)
+        fig.autofmt_xdate()
+        if len(series) < len(series_df):
+            st.caption(f"Показано {len(series)} з {len(series_df)} тижневих значень")
 
         ax.grid(True)
         st.pyplot(fig)
+        plt.close(fig)
 
     with tab3:
-        st.subheader(f"Середні значення {selected_index} по всіх областях")
-        comp_df = df[
-            (df['week'].between(*week_range)) &
-            (df['year'].between(*year_range))
-        ]
-        mean_values = comp_df.groupby("area_ID")[selected_index].mean()
+        comparison_stat = st.selectbox("Статистика", options=list(COMPARISON_STATS), key="comparison_stat")
+        st.subheader(f"{comparison_stat} {selected_index} по всіх областях")
+        # Префіксні суми куба: будь-який інтервал років x тижнів за O(кількість областей)
+        cube = read_comparison_cube(directory)
+        q = COMPARISON_STATS[comparison_stat]
+        if q is None:
+            mean_values = cube.mean(selected_index, year_range, week_range)
+        else:
+            mean_values = cube.percentile(selected_index, q, year_range, week_range)
         mean_values = mean_values.rename(index=area_dict).sort_values()
         fig2, ax2 = plt.subplots(figsize=(10, 5))
         mean_values.plot(kind='bar', ax=ax2, color='#1f77b4')
-        ax2.set_ylabel(f"Середнє {selected_index}")
+        ax2.set_ylabel(f"{comparison_stat} {selected_index}")
         ax2.set_xlabel("Область")
         ax2.grid(axis='y')
         st.pyplot(fig2)
+        plt.close(fig2)
 
 
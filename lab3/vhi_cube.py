@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+CUBE_COLS = ["VCI", "TCI", "VHI"]
+
+
+def _prefix2d(grid, dtype):
+    # Префіксні суми по осях (рік, тиждень) з нульовим рядком/стовпцем спереду
+    out = np.zeros((grid.shape[0], grid.shape[1] + 1, grid.shape[2] + 1) + grid.shape[3:], dtype=dtype)
+    out[:, 1:, 1:] = grid
+    np.cumsum(out, axis=1, out=out)
+    np.cumsum(out, axis=2, out=out)
+    return out
+
+
+class ComparisonCube:
+    # Куб значень (область, рік, тиждень) з префіксними сумами: сума/кількість
+    # для будь-якого прямокутника років x тижнів — 4 звернення на область.
+    # Для медіани й перцентилів — гістограмні ескізи з такими ж префіксами
+    def __init__(self, df, columns=CUBE_COLS, bins=100, value_range=(0.0, 100.0)):
+        if "country" in df.columns and df["country"].nunique() > 1:
+            raise ValueError("ComparisonCube будується для однієї країни: номери областей у країнах повторюються")
+        self.areas = np.array(sorted(int(a) for a in pd.unique(df["area_ID"].to_numpy(dtype=np.int64))))
+        self.year0 = int(df["year"].min())
+        self.n_years = int(df["year"].max()) - self.year0 + 1
+        self.n_weeks = int(df["week"].max())
+        self.bins = bins
+        self.value_range = value_range
+
+        self._a = np.searchsorted(self.areas, df["area_ID"].to_numpy(dtype=np.int64))
+        self._y = df["year"].to_numpy(dtype=np.int64) - self.year0
+        self._w = df["week"].to_numpy(dtype=np.int64) - 1
+        self._values = {}
+        self._sums = {}
+        self._counts = {}
+        self._sketches = {}
+
+        shape = (len(self.areas), self.n_years, self.n_weeks)
+        for col in columns:
+            values = df[col].to_numpy(dtype=np.float64)
+            # -1 у NOAA — пропуск, у середні не входить
+            valid = np.isfinite(values) & (values >= 0)
+            cell = (self._a[valid], self._y[valid], self._w[valid])
+            grid = np.zeros(shape)
+            counts = np.zeros(shape, dtype=np.int32)
+            np.add.at(grid, cell, values[valid])
+            np.add.at(counts, cell, 1)
+            self._values[col] = (cell, values[valid])
+            self._sums[col] = _prefix2d(grid, np.float64)
+            self._counts[col] = _prefix2d(counts, np.int64)
+
+    def _slices(self, year_range, week_range):
+        y1 = int(np.clip(year_range[0] - self.year0, 0, self.n_years))
+        y2 = int(np.clip(year_range[1] - self.year0 + 1, y1, self.n_years))
+        w1 = int(np.clip(week_range[0] - 1, 0, self.n_weeks))
+        w2 = int(np.clip(week_range[1], w1, self.n_weeks))
+        return y1, y2, w1, w2
+
+    def _rect(self, prefix, year_range, week_range):
+        y1, y2, w1, w2 = self._slices(year_range, week_range)
+        # Беззнакові ескізи переводимо в int64, щоб різниця кутів не переповнювалась
+        dtype = np.int64 if prefix.dtype.kind == "u" else prefix.dtype
+        corners = [prefix[:, y, w].astype(dtype) for y, w in ((y2, w2), (y1, w2), (y2, w1), (y1, w1))]
+        return corners[0] - corners[1] - corners[2] + corners[3]
+
+    def mean(self, column, year_range, week_range):
+        sums = self._rect(self._sums[column], year_range, week_range)
+        counts = self._rect(self._counts[column], year_range, week_range)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = sums / counts
+        return pd.Series(means, index=pd.Index(self.areas, name="area_ID"), name=column).dropna()
+
+    def _sketch(self, column):
+        if column not in self._sketches:
+            (a, y, w), values = self._values[column]
+            lo, hi = self.value_range
+            b = np.clip(((values - lo) / (hi - lo) * self.bins).astype(np.int64), 0, self.bins - 1)
+            hist = np.zeros((len(self.areas), self.n_years, self.n_weeks, self.bins), dtype=np.int32)
+            np.add.at(hist, (a, y, w, b), 1)
+            dtype = np.uint16 if self.n_years * self.n_weeks < 2 ** 16 else np.uint32
+            self._sketches[column] = _prefix2d(hist, dtype)
+        return self._sketches[column]
+
+    def percentile(self, column, q, year_range, week_range):
+        # Наближено з точністю до ширини кошика (1 пункт індексу при 100 кошиках)
+        hist = self._rect(self._sketch(column), year_range, week_range)
+        total = hist.sum(axis=1)
+        cum = np.cumsum(hist, axis=1)
+        target = q / 100.0 * total
+        b = np.argmax(cum >= target[:, None], axis=1)
+        rows = np.arange(len(self.areas))
+        in_bin = hist[rows, b]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            frac = np.where(in_bin > 0, (target - (cum[rows, b] - in_bin)) / in_bin, 0.0)
+        lo, hi = self.value_range
+        values = lo + (b + frac) * (hi - lo) / self.bins
+        values = np.where(total > 0, values, np.nan)
+        return pd.Series(values, index=pd.Index(self.areas, name="area_ID"), name=column).dropna()
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+AGGREGATIONS = {
+    "Тиждень": None,
+    "Місяць": "MS",
+    "Сезон": "QS-DEC",
+    "Рік": "YS",
+}
+
+
+def week_dates(year, week):
+    # Тиждень NOAA 1..52 -> дата його початку (1 січня + 7 * (week - 1) днів)
+    year = np.asarray(year, dtype=np.int64)
+    week = np.asarray(week, dtype=np.int64)
+    start = (year - 1970).astype("datetime64[Y]").astype("datetime64[D]")
+    return start + (week - 1) * 7
+
+
+def to_series(df, column):
+    # Впорядкований за часом ряд; -1 у NOAA означає пропуск, тому -> NaN
+    df = df.sort_values(["year", "week"])
+    values = df[column].to_numpy(dtype=np.float64)
+    values = np.where(values < 0, np.nan, values)
+    return pd.Series(values, index=pd.DatetimeIndex(week_dates(df["year"], df["week"])), name=column)
+
+
+def aggregate(series, freq):
+    if freq is None:
+        return series.dropna()
+    return series.resample(freq).mean().dropna()
+
+
+def lttb(x, y, n_out):
+    # Largest-Triangle-Three-Buckets: зберігає форму ряду при n_out точках
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    xf = x.astype(np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt_lo, nxt_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        cx, cy = xf[nxt_lo:nxt_hi].mean(), y[nxt_lo:nxt_hi].mean()
+        area = np.abs((xf[a] - cx) * (y[lo:hi] - y[a]) - (xf[a] - xf[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def minmax(x, y, n_out):
+    # Мінімум і максимум у кожному з n_out / 2 кошиків: піки не губляться
+    n = len(x)
+    if n_out >= n or n_out < 2:
+        return np.arange(n)
+    edges = np.linspace(0, n, n_out // 2 + 1).astype(np.int64)
+    keep = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi > lo:
+            seg = y[lo:hi]
+            keep.extend(sorted({lo + int(np.argmin(seg)), lo + int(np.argmax(seg))}))
+    return np.asarray(keep, dtype=np.int64)
+
+
+DOWNSAMPLERS = {"LTTB": lttb, "Min-Max": minmax}
+
+
+def prepare_plot_series(df, column, aggregation=None, method="LTTB", max_points=500):
+    series = aggregate(to_series(df, column), AGGREGATIONS.get(aggregation, aggregation))
+    if len(series) > max_points:
+        keep = DOWNSAMPLERS[method](series.index.asi8, series.to_numpy(), max_points)
+        series = series.iloc[keep]
+    return series
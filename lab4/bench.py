@@ -0,0 +1,248 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime as dt
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from mpg_pipeline import MPG_COLS, MPG_PATH, MpgPipeline, read_mpg
+from power_data import DATA_PATH, NUMERIC_COLS
+from power_parallel import PARALLEL_TASKS
+from power_rollups import ROLLUP_TASKS
+from power_tasks import TASKS, PowerData, synthetic_power
+
+class Benchmark:
+    def __init__(self, name, variants, make_input, compare=None, sizes=()):
+        self.name = name
+        self.variants = variants
+        self.make_input = make_input
+        self.compare = compare
+        self.sizes = list(sizes)
+
+
+BENCHMARKS = {}
+
+
+def register(name, variants, make_input, compare=None, sizes=()):
+    BENCHMARKS[name] = Benchmark(name, variants, make_input, compare, sizes)
+    return BENCHMARKS[name]
+
+
+# === Вимірювання ===
+def _timings(fn, arg, warmup, repeat):
+    for _ in range(warmup):
+        fn(arg)
+    gc.collect()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        times.append(time.perf_counter() - start)
+    return np.asarray(times)
+
+
+def _peak_memory(fn, arg):
+    # Окремий прогін під tracemalloc (NumPy і pandas реєструють свої буфери),
+    # щоб накладні витрати трасування не потрапили в час
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_benchmark(bench, arg, size, warmup=1, repeat=5, memory=True):
+    outputs = {label: fn(arg) for label, fn in bench.variants.items()}
+    equivalent = None
+    if bench.compare is not None and len(outputs) > 1:
+        first, *rest = outputs.values()
+        equivalent = all(bench.compare(first, other) for other in rest)
+
+    results = []
+    for label, fn in bench.variants.items():
+        times = _timings(fn, arg, warmup, repeat)
+        results.append({
+            "benchmark": bench.name,
+            "variant": label,
+            "size": int(size),
+            "repeat": repeat,
+            "median_s": float(np.median(times)),
+            "p95_s": float(np.percentile(times, 95)),
+            "min_s": float(times.min()),
+            "peak_mem_bytes": int(_peak_memory(fn, arg)) if memory else None,
+            "equivalent": equivalent,
+        })
+    return results
+
+
+def run_suite(names=None, sizes=None, warmup=1, repeat=5, seed=0, memory=True):
+    results = []
+    for name in names or list(BENCHMARKS):
+        bench = BENCHMARKS[name]
+        for size in sizes or bench.sizes:
+            arg = bench.make_input(size, seed)
+            results.extend(run_benchmark(bench, arg, size, warmup, repeat, memory))
+    return results
+
+
+# === Звіти ===
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_json(results, path):
+    report = {
+        "meta": {
+            "timestamp": dt.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+def print_results(results):
+    for r in results:
+        mem = f"{r['peak_mem_bytes'] / 2**20:8.1f} МБ" if r["peak_mem_bytes"] is not None else ""
+        eq = {True: "", False: "  РЕЗУЛЬТАТИ РІЗНЯТЬСЯ", None: ""}[r["equivalent"]]
+        print(f"{r['benchmark']:<16} {r['variant']:<8} n={r['size']:<9} "
+              f"медіана {r['median_s']:.5f} с  p95 {r['p95_s']:.5f} с  {mem}{eq}")
+
+
+def compare_to_baseline(results, baseline_path):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(r["benchmark"], r["variant"], r["size"]): r for r in json.load(f)["results"]}
+    for r in results:
+        old = baseline.get((r["benchmark"], r["variant"], r["size"]))
+        if old:
+            ratio = r["median_s"] / old["median_s"] if old["median_s"] else float("inf")
+            print(f"{r['benchmark']:<16} {r['variant']:<8} n={r['size']:<9} x{ratio:.2f} відносно базового")
+
+
+# === Завдання lab4_task1 ===
+def _as_array(result):
+    if isinstance(result, pd.DataFrame):
+        return result[NUMERIC_COLS].to_numpy()
+    if isinstance(result, pd.Series):
+        return result.to_numpy()
+    return np.asarray(result)
+
+
+def compare_power(a, b):
+    a, b = _as_array(a), _as_array(b)
+    return a.shape == b.shape and np.allclose(a, b, rtol=1e-5)
+
+
+@lru_cache(maxsize=2)
+def synthetic_power_data(size, seed=0):
+    return PowerData(*synthetic_power(size, seed))
+
+
+for _name, (_numpy_fn, _pandas_fn) in TASKS.items():
+    _variants = {"numpy": _numpy_fn, "pandas": _pandas_fn, "parallel": PARALLEL_TASKS[_name]}
+    if _name in ROLLUP_TASKS:
+        _variants["rollup"] = ROLLUP_TASKS[_name]
+    register(f"power_{_name}", _variants, synthetic_power_data, compare_power, sizes=[100_000, 1_000_000])
+
+
+# === Передобробка auto-mpg (lab4_task2) ===
+def mpg_numpy(path):
+    data = np.genfromtxt(path, dtype=float, usecols=range(8), missing_values="NA", filling_values=np.nan)
+    data = np.where(np.isnan(data), np.nanmedian(data, axis=0), data)
+    norm = (data - np.min(data, axis=0)) / np.ptp(data, axis=0)
+    std = (data - np.mean(data, axis=0)) / np.std(data, axis=0)
+    return norm, std
+
+
+def mpg_pandas(path):
+    df = pd.read_csv(path, sep=r"\s+", names=MPG_COLS, na_values="NA")
+    numeric = df.drop(columns=["car name"])
+    numeric = numeric.fillna(numeric.median())
+    norm = (numeric - numeric.min()) / (numeric.max() - numeric.min())
+    std = (numeric - numeric.mean()) / numeric.std(ddof=0)
+    return norm, std
+
+
+def mpg_pipeline(path):
+    values, _ = read_mpg(path)
+    return MpgPipeline().fit(values).transform(values)
+
+
+def compare_mpg(a, b):
+    return all(np.allclose(np.asarray(x, dtype=float), np.asarray(y, dtype=float), equal_nan=True)
+               for x, y in zip(a, b))
+
+
+@lru_cache(maxsize=4)
+def synthetic_mpg_file(size, seed=0):
+    rng = np.random.default_rng(seed)
+    hp = rng.uniform(46, 230, size).round(0).astype(str)
+    hp[rng.random(size) < 0.02] = "NA"
+    rows = zip(rng.uniform(9, 47, size).round(1), rng.choice([3, 4, 5, 6, 8], size),
+               rng.uniform(68, 455, size).round(0), hp, rng.uniform(1600, 5200, size).round(0),
+               rng.uniform(8, 25, size).round(1), rng.integers(70, 83, size), rng.integers(1, 4, size))
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_mpg_"), f"auto-mpg-{size}.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        for i, row in enumerate(rows):
+            f.write("   ".join(str(v) for v in row) + f'\t"car {i}"\n')
+    return path
+
+
+register("mpg_preprocess", {"numpy": mpg_numpy, "pandas": mpg_pandas, "pipeline": mpg_pipeline},
+         synthetic_mpg_file, compare_mpg, sizes=[398, 100_000])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарки NumPy / Pandas для lab4")
+    parser.add_argument("--bench", nargs="+", choices=sorted(BENCHMARKS), help="які бенчмарки запускати")
+    parser.add_argument("--sizes", nargs="+", type=int, help="розміри синтетичних даних")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--real", action="store_true", help="справжні файли замість синтетичних даних")
+    parser.add_argument("--no-memory", action="store_true")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--baseline", help="JSON попереднього запуску для порівняння")
+    args = parser.parse_args()
+
+    names = args.bench or list(BENCHMARKS)
+    if args.real:
+        from power_store import open_store
+        results = []
+        power = PowerData.from_store(open_store(DATA_PATH)) if any(n.startswith("power_") for n in names) else None
+        for name in names:
+            if name.startswith("power_"):
+                arg, size = power, len(power.values)
+            else:
+                with open(MPG_PATH, "r", encoding="utf-8") as f:
+                    arg, size = MPG_PATH, sum(1 for line in f if line.strip())
+            results.extend(run_benchmark(BENCHMARKS[name], arg, size, args.warmup, args.repeat,
+                                         not args.no_memory))
+    else:
+        results = run_suite(names, args.sizes, args.warmup, args.repeat, args.seed, not args.no_memory)
+
+    print_results(results)
+    write_json(results, args.out)
+    print(f"Результати збережено у {args.out}")
+    if args.baseline:
+        compare_to_baseline(results, args.baseline)
@@ -0,0 +1,182 @@
+import numpy as np
+from scipy import stats
+
+from stream_stats import RunningStats
+
+
+class CoMoments:
+    # Середні і матриця спільних моментів C = sum((x - mean)(x - mean)^T) по всіх
+    # колонках. Пакети і частини зливаються формулою Чена:
+    # C = Ca + Cb + outer(delta, delta) * na * nb / n
+    def __init__(self, width):
+        self.count = 0
+        self.mean = np.zeros(width)
+        self.comoment = np.zeros((width, width))
+
+    @classmethod
+    def of(cls, batch):
+        batch = np.asarray(batch, dtype=np.float64)
+        moments = cls(batch.shape[1])
+        if len(batch):
+            moments.count = len(batch)
+            moments.mean = batch.mean(axis=0)
+            centered = batch - moments.mean
+            moments.comoment = centered.T @ centered
+        return moments
+
+    def update(self, batch):
+        return self.merge(CoMoments.of(batch))
+
+    def merge(self, other):
+        n = self.count + other.count
+        if n == 0:
+            return self
+        delta = other.mean - self.mean
+        self.comoment = self.comoment + other.comoment + np.outer(delta, delta) * (self.count * other.count / n)
+        self.mean = self.mean + delta * (other.count / n)
+        self.count = n
+        return self
+
+    def corr(self):
+        scale = np.sqrt(np.diag(self.comoment))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r = self.comoment / np.outer(scale, scale)
+        np.clip(r, -1.0, 1.0, out=r)
+        np.fill_diagonal(r, 1.0)
+        return r
+
+
+class RankTable:
+    # Середні ранги (як у scipy.stats.rankdata) для кожної колонки з таблиці
+    # унікальних значень і їх кількостей. Таблиця будується один раз (можна
+    # блоками), далі будь-який блок переводиться в ранги через searchsorted
+    def __init__(self, width):
+        self.values = [np.empty(0) for _ in range(width)]
+        self.counts = [np.empty(0, dtype=np.int64) for _ in range(width)]
+        self._midranks = None
+
+    def update(self, batch):
+        for j, column in enumerate(np.asarray(batch, dtype=np.float64).T):
+            values, counts = np.unique(column, return_counts=True)
+            merged, codes = np.unique(np.concatenate([self.values[j], values]), return_inverse=True)
+            self.counts[j] = np.bincount(codes, weights=np.concatenate([self.counts[j], counts]),
+                                         minlength=len(merged)).astype(np.int64)
+            self.values[j] = merged
+        self._midranks = None
+        return self
+
+    def midranks(self):
+        if self._midranks is None:
+            self._midranks = [np.cumsum(c) - (c - 1) / 2 for c in self.counts]
+        return self._midranks
+
+    def ranks(self, batch):
+        batch = np.asarray(batch, dtype=np.float64)
+        out = np.empty(batch.shape)
+        for j, (column, midrank) in enumerate(zip(batch.T, self.midranks())):
+            out[:, j] = midrank[np.searchsorted(self.values[j], column)]
+        return out
+
+
+def p_values(r, n):
+    # Двосторонні p-значення для всієї матриці одразу: t = r * sqrt((n - 2) / (1 - r^2))
+    r = np.asarray(r, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = r * np.sqrt((n - 2) / (1.0 - r * r))
+    p = 2 * stats.t.sf(np.abs(t), n - 2)
+    return np.where(np.abs(r) >= 1.0, 0.0, p)
+
+
+def pearson_matrix(values):
+    return CoMoments.of(values).corr()
+
+
+def spearman_matrix(values, ranks=None):
+    # Ранги рахуються один раз на колонку; їх можна передати і перевикористати
+    ranks = stats.rankdata(values, axis=0) if ranks is None else ranks
+    return CoMoments.of(ranks).corr()
+
+
+def correlation_matrices(values):
+    values = np.asarray(values, dtype=np.float64)
+    pearson = pearson_matrix(values)
+    spearman = spearman_matrix(values)
+    n = len(values)
+    return {"pearson": pearson, "pearson_p": p_values(pearson, n),
+            "spearman": spearman, "spearman_p": p_values(spearman, n)}
+
+
+def correlation_matrices_chunked(make_batches):
+    # Дані, що не вміщаються в пам'ять: make_batches() повертає новий ітератор
+    # пакетів (n_i, k). Перший прохід — моменти Пірсона і таблиці рангів,
+    # другий — моменти рангів; результат збігається з обчисленням на масиві
+    pearson = ranks = None
+    for batch in make_batches():
+        if pearson is None:
+            pearson, ranks = CoMoments(batch.shape[1]), RankTable(batch.shape[1])
+        pearson.update(batch)
+        ranks.update(batch)
+    if pearson is None:
+        raise ValueError("Немає даних для кореляції")
+
+    spearman = CoMoments(len(pearson.mean))
+    for batch in make_batches():
+        spearman.update(ranks.ranks(batch))
+    n = pearson.count
+    return {"pearson": pearson.corr(), "pearson_p": p_values(pearson.corr(), n),
+            "spearman": spearman.corr(), "spearman_p": p_values(spearman.corr(), n)}
+
+
+# === Pairplot з 2D-гістограм ===
+class PairHistograms:
+    # Фіксовані межі бінів (з min/max) і лічильники, що додаються блоками:
+    # розмір картинки не залежить від кількості рядків
+    def __init__(self, lows, highs, bins=40):
+        self.edges = [np.linspace(lo, hi if hi > lo else lo + 1, bins + 1) for lo, hi in zip(lows, highs)]
+        k = len(self.edges)
+        self.diag = [np.zeros(bins, dtype=np.int64) for _ in range(k)]
+        self.pairs = {(i, j): np.zeros((bins, bins), dtype=np.int64) for i in range(k) for j in range(k) if i != j}
+
+    @classmethod
+    def of(cls, values, bins=40):
+        return cls.from_stats(RunningStats.of(values), bins).update(values)
+
+    @classmethod
+    def from_stats(cls, running, bins=40):
+        return cls(running.min, running.max, bins)
+
+    def update(self, batch):
+        batch = np.asarray(batch, dtype=np.float64)
+        for i, edges in enumerate(self.edges):
+            self.diag[i] += np.histogram(batch[:, i], edges)[0]
+        for (i, j), counts in self.pairs.items():
+            if i < j:
+                h = np.histogram2d(batch[:, j], batch[:, i], [self.edges[j], self.edges[i]])[0].astype(np.int64)
+                counts += h
+                self.pairs[(j, i)] += h.T
+        return self
+
+    def plot(self, names):
+        import matplotlib.pyplot as plt
+        from matplotlib.colors import LogNorm
+        k = len(self.edges)
+        fig, axes = plt.subplots(k, k, figsize=(2.5 * k, 2.5 * k), squeeze=False)
+        for i in range(k):
+            for j in range(k):
+                ax = axes[i, j]
+                if i == j:
+                    ax.stairs(self.diag[i], self.edges[i], fill=True, alpha=0.7)
+                else:
+                    counts = self.pairs[(i, j)]
+                    ax.pcolormesh(self.edges[j], self.edges[i], np.ma.masked_equal(counts.T, 0),
+                                  norm=LogNorm(), cmap="viridis", shading="flat")
+                if i == k - 1:
+                    ax.set_xlabel(names[j])
+                if j == 0:
+                    ax.set_ylabel(names[i])
+        fig.tight_layout()
+        return fig
+
+
+def binned_pairplot(values, names, bins=40):
+    return PairHistograms.of(values, bins).plot(names)
@@ -1,93 +1,94 @@
-import numpy as np
+import argparse
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.stats import pearsonr, spearmanr
-import timeit
-import os
-
-# --- 1. Зчитування даних ---
-col_names = ["mpg", "cylinders", "displacement", "horsepower", "weight",
-             "acceleration", "model year", "origin", "car name"]
-
-df = pd.read_csv(os.path.join(os.path.dirname(__file__),"auto-mpg.txt"), delim_whitespace=True, names=col_names, na_values="NA")
-data_np = np.genfromtxt(os.path.join(os.path.dirname(__file__),"auto-mpg.txt"), dtype=float, usecols=range(8), missing_values="NA", filling_values=np.nan)
-
-# --- 2. Обробка пропущених значень ---
-df['horsepower'].fillna(df['horsepower'].median(), inplace=True)
-df['mpg'].fillna(df['mpg'].mean(), inplace=True)
-data_np = np.where(np.isnan(data_np), np.nanmedian(data_np, axis=0), data_np)
-
-# --- 3. Нормалізація / стандартизація (ручні функції) ---
-def normalize(data):
-    return (data - np.min(data, axis=0)) / (np.ptp(data, axis=0))
-
-def standardize(data):
-    return (data - np.mean(data, axis=0)) / np.std(data, axis=0)
-
-norm_np = normalize(data_np)
-std_np = standardize(data_np)
-
-df_numeric = df.drop(columns=["car name"])
-norm_pd = (df_numeric - df_numeric.min()) / (df_numeric.max() - df_numeric.min())
-std_pd = (df_numeric - df_numeric.mean()) / df_numeric.std()
-
-# --- 4. Гістограма (mpg) ---
-plt.hist(df['mpg'], bins=[0,10,15,20,25,30,35,40,45,50,55], edgecolor='black')
-plt.title("Гістограма mpg")
-plt.xlabel("mpg")
-plt.ylabel("Кількість")
-plt.show()
-
-# --- 5. Графік залежності (horsepower vs mpg) ---
-plt.scatter(df['horsepower'], df['mpg'], alpha=0.7)
-plt.title("Залежність mpg від horsepower")
-plt.xlabel("Horsepower")
-plt.ylabel("MPG")
-plt.grid(True)
-plt.show()
-
-# --- 6. Коефіцієнти кореляції ---
-pearson_corr, _ = pearsonr(df['horsepower'], df['mpg'])
-spearman_corr, _ = spearmanr(df['horsepower'], df['mpg'])
-print(f"Коефіцієнт Пірсона: {pearson_corr:.4f}")
-print(f"Коефіцієнт Спірмена: {spearman_corr:.4f}")
-
-# --- 7. One-Hot Encoding по 'origin' ---
-df_encoded = pd.get_dummies(df, columns=['origin'], prefix='origin')
-print("One-Hot Encoding по 'origin':")
-print(df_encoded.head())
-
-# --- 8. Багатовимірна візуалізація (Pairplot) ---
-sns.pairplot(df_numeric[["mpg", "horsepower", "weight", "acceleration"]])
-plt.suptitle("Pairplot числових атрибутів", y=1.02)
-plt.show()
-
-# --- 9. Timeit: профілювання NumPy ---
-numpy_code = r'''
-import numpy as np
-data = np.genfromtxt(r"C:\Users\Kiril\Desktop\Prog\zapd\lab4\auto-mpg.txt", dtype=float, usecols=range(8), missing_values="NA", filling_values=np.nan)
-data = np.where(np.isnan(data), np.nanmedian(data, axis=0), data)
-norm = (data - np.min(data, axis=0)) / (np.ptp(data, axis=0))
-std = (data - np.mean(data, axis=0)) / np.std(data, axis=0)
-'''
-
-numpy_time = timeit.timeit(stmt=numpy_code, number=100, setup="pass")
-
-# --- 10. Timeit: профілювання Pandas ---
-pandas_code = r'''
-import pandas as pd
-df = pd.read_csv(r"C:\Users\Kiril\Desktop\Prog\zapd\lab4\auto-mpg.txt", delim_whitespace=True, names=["mpg", "cylinders", "displacement", "horsepower", "weight", 
-                                                               "acceleration", "model year", "origin", "car name"], na_values="NA")
-df["horsepower"].fillna(df["horsepower"].median(), inplace=True)
-df["mpg"].fillna(df["mpg"].mean(), inplace=True)
-numeric = df.drop(columns=["car name"])
-norm = (numeric - numeric.min()) / (numeric.max() - numeric.min())
-std = (numeric - numeric.mean()) / numeric.std()
-'''
-
-pandas_time = timeit.timeit(stmt=pandas_code, number=100, setup="pass")
-
-# --- Вивід результатів timeit ---
-print(f"\n⏱️ NumPy: час обробки за 100 повторів: {numpy_time:.4f} сек")
-print(f"⏱️ Pandas: час обробки за 100 повторів: {pandas_time:.4f} сек")
+from bench import BENCHMARKS, run_benchmark, print_results
+from correlation import correlation_matrices
+from mpg_figures import render_report, show_figures
+from mpg_pipeline import MPG_PATH, NUMERIC_COLS, MpgPipeline, read_mpg
+
+PAIR_COLS = ["mpg", "horsepower", "weight", "acceleration"]
+
+
+def analyze(path=MPG_PATH):
+    # Усі обчислення без графіків: результат — словник масивів і таблиць
+    # --- 1. Зчитування даних ---
+    # Файл розбирається один раз у масив (n, 8) float64 + назви авто
+    data_raw, car_names = read_mpg(path)
+
+    # --- 2. Обробка пропущених значень ---
+    # Статистики (медіани, min/max, середнє/std) рахуються один раз у fit і
+    # далі застосовуються до будь-яких нових пакетів тих самих колонок
+    pipeline = MpgPipeline().fit(data_raw)
+    data_np = pipeline.impute(data_raw)
+
+    df = pd.DataFrame(data_np, columns=NUMERIC_COLS, copy=False)
+    df["car name"] = car_names
+
+    # --- 3. Нормалізація / стандартизація ---
+    norm_np, std_np = pipeline.transform(data_raw)
+
+    # --- 6. Коефіцієнти кореляції ---
+    # Повні матриці Пірсона і Спірмена (ранги — один раз на колонку) з p-значеннями
+    corr = correlation_matrices(data_np)
+
+    # --- 7. One-Hot Encoding по 'origin' ---
+    # Коди категорій одразу в масив uint8 замість копій pd.get_dummies
+    origin_hot = pd.DataFrame(pipeline.one_hot(data_raw), columns=pipeline.one_hot_names, copy=False)
+    df_encoded = pd.concat([df.drop(columns=["origin"]), origin_hot], axis=1)
+
+    return {"data": data_np, "df": df, "norm": norm_np, "std": std_np,
+            "corr": corr, "df_encoded": df_encoded}
+
+
+def figure_specs(results):
+    # --- 4, 5, 8. Графіки: лише входи, рисування — у mpg_figures ---
+    data = results["data"]
+    column = {name: data[:, NUMERIC_COLS.index(name)] for name in NUMERIC_COLS}
+    return [
+        ("mpg_hist", {"mpg": column["mpg"]}, {}),
+        ("hp_scatter", {"horsepower": column["horsepower"], "mpg": column["mpg"]}, {}),
+        ("pairplot", {"values": data[:, [NUMERIC_COLS.index(c) for c in PAIR_COLS]]}, {"names": PAIR_COLS}),
+    ]
+
+
+def print_numbers(results):
+    corr = results["corr"]
+    hp, mpg = NUMERIC_COLS.index("horsepower"), NUMERIC_COLS.index("mpg")
+    print(f"Коефіцієнт Пірсона: {corr['pearson'][hp, mpg]:.4f} (p = {corr['pearson_p'][hp, mpg]:.2e})")
+    print(f"Коефіцієнт Спірмена: {corr['spearman'][hp, mpg]:.4f} (p = {corr['spearman_p'][hp, mpg]:.2e})")
+    print("Матриця Пірсона:")
+    print(pd.DataFrame(corr["pearson"], index=NUMERIC_COLS, columns=NUMERIC_COLS).round(3))
+    print("Матриця Спірмена:")
+    print(pd.DataFrame(corr["spearman"], index=NUMERIC_COLS, columns=NUMERIC_COLS).round(3))
+
+    print("One-Hot Encoding по 'origin':")
+    print(results["df_encoded"].head())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Аналіз auto-mpg (lab4, завдання 2)")
+    parser.add_argument("--report", metavar="DIR", help="без вікон: зберегти графіки в DIR (Agg, процес на графік)")
+    parser.add_argument("--no-plots", action="store_true", help="лише числа, без графіків")
+    parser.add_argument("--no-bench", action="store_true", help="без профілювання")
+    parser.add_argument("--workers", type=int, help="процесів для рисування звіту")
+    args = parser.parse_args()
+
+    results = analyze(MPG_PATH)
+    print_numbers(results)
+
+    if args.report:
+        paths, cached = render_report(figure_specs(results), args.report, args.workers)
+        for name, path in paths.items():
+            print(f"{name}: {path}")
+        print(f"Графіків з кешу: {cached} з {len(paths)}")
+    elif not args.no_plots:
+        show_figures(figure_specs(results))
+
+    # --- 9. Профілювання NumPy / Pandas ---
+    # Обидва варіанти зареєстровані в bench.py як функції від шляху до файлу:
+    # прогрів, повтори, медіана/p95, пікова пам'ять і перевірка однаковості результатів
+    if not args.no_bench:
+        mpg_results = run_benchmark(BENCHMARKS["mpg_preprocess"], MPG_PATH, len(results["df"]),
+                                    warmup=2, repeat=100)
+
+        # --- Вивід результатів ---
+        print_results(mpg_results)
@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Рисування відокремлене від обчислень: кожен графік — функція від готових
+# масивів, що повертає Figure. pyplot імпортується лише під час рисування
+FIGURES = {}
+MPG_BINS = [0, 10, 15, 20, 25, 30, 35, 40, 45, 50, 55]
+
+
+def figure(name):
+    def register(fn):
+        FIGURES[name] = fn
+        return fn
+    return register
+
+
+@figure("mpg_hist")
+def mpg_hist(mpg):
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots()
+    ax.hist(mpg, bins=MPG_BINS, edgecolor="black")
+    ax.set_title("Гістограма mpg")
+    ax.set_xlabel("mpg")
+    ax.set_ylabel("Кількість")
+    return fig
+
+
+@figure("hp_scatter")
+def hp_scatter(horsepower, mpg):
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots()
+    ax.scatter(horsepower, mpg, alpha=0.7)
+    ax.set_title("Залежність mpg від horsepower")
+    ax.set_xlabel("Horsepower")
+    ax.set_ylabel("MPG")
+    ax.grid(True)
+    return fig
+
+
+@figure("pairplot")
+def pairplot(values, names):
+    # 2D-гістограми замість точок: вартість малювання не залежить від кількості рядків
+    from correlation import binned_pairplot
+    fig = binned_pairplot(values, names)
+    fig.suptitle("Pairplot числових атрибутів", y=1.02)
+    return fig
+
+
+def figure_key(name, arrays, params):
+    # Хеш вхідних даних і параметрів: той самий вхід — той самий файл
+    digest = hashlib.sha256(name.encode())
+    for key in sorted(arrays):
+        array = np.ascontiguousarray(arrays[key])
+        digest.update(f"{key}:{array.dtype}:{array.shape}".encode())
+        digest.update(array.tobytes())
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return digest.hexdigest()[:16]
+
+
+def _render(name, arrays, params, path):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    fig = FIGURES[name](**arrays, **params)
+    tmp_path = path + ".tmp"
+    fig.savefig(tmp_path, format="png", dpi=120, bbox_inches="tight")
+    plt.close(fig)
+    os.replace(tmp_path, path)
+    return path
+
+
+def render_report(specs, out_dir, workers=None):
+    # specs — список (назва, {аргумент: масив}, {параметр: значення}).
+    # Кожен графік рисується в окремому процесі з бекендом Agg; файл з тим самим
+    # хешем входу вже є — рисування пропускається
+    os.makedirs(out_dir, exist_ok=True)
+    paths, todo = {}, []
+    for name, arrays, params in specs:
+        path = os.path.join(out_dir, f"{name}-{figure_key(name, arrays, params)}.png")
+        paths[name] = path
+        if not os.path.exists(path):
+            todo.append((name, arrays, params, path))
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers or len(todo)) as pool:
+            for future in [pool.submit(_render, *job) for job in todo]:
+                future.result()
+    return paths, len(specs) - len(todo)
+
+
+def show_figures(specs):
+    import matplotlib.pyplot as plt
+    for name, arrays, params in specs:
+        FIGURES[name](**arrays, **params)
+        plt.show()
@@ -0,0 +1,160 @@
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from power_sampling import Reservoir
+from stream_stats import RunningStats, safe_scale
+
+MPG_PATH = os.path.join(os.path.dirname(__file__), "auto-mpg.txt")
+MPG_COLS = ["mpg", "cylinders", "displacement", "horsepower", "weight",
+            "acceleration", "model year", "origin", "car name"]
+NUMERIC_COLS = MPG_COLS[:8]
+BATCH_ROWS = 100_000
+MEDIAN_SAMPLE = 1_000_000
+
+# Числа одразу у float64, "NA" -> NaN під час розбору; рядком лишається тільки назва
+_READ_OPTS = dict(
+    sep=r"\s+",
+    names=MPG_COLS,
+    na_values="NA",
+    keep_default_na=False,
+    dtype={col: np.float64 for col in NUMERIC_COLS},
+)
+
+
+def _split(frame):
+    return frame[NUMERIC_COLS].to_numpy(dtype=np.float64), frame["car name"].to_numpy()
+
+
+def read_mpg(path=MPG_PATH):
+    # Один розбір файлу: масив (n, 8) float64 і масив назв
+    return _split(pd.read_csv(path, **_READ_OPTS))
+
+
+def iter_mpg_batches(path=MPG_PATH, batch_size=BATCH_ROWS):
+    with pd.read_csv(path, chunksize=batch_size, **_READ_OPTS) as reader:
+        for frame in reader:
+            yield _split(frame)
+
+
+def _nanmedian(values):
+    # Порожня (вся з NaN) колонка дає NaN без попередження — далі заповнюється нулем
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmedian(values, axis=0)
+
+
+class MpgPipeline:
+    # Статистики рахуються один раз: медіани для пропусків, min/max і
+    # середнє/std уже заповнених даних. transform() застосовує їх до нових
+    # пакетів без повторного розбору і перерахунку — у готові буфери або на місці.
+    # fit() — масив у пам'яті; partial_fit()/merge()/finish() — пакети і воркери
+    # (моменти зливаються точно, медіана — з резервуару до sample_size рядків,
+    # тож точна, поки рядків не більше; воркерам потрібні різні seed)
+    def __init__(self, columns=NUMERIC_COLS, category="origin", sample_size=MEDIAN_SAMPLE, seed=42):
+        self.columns = list(columns)
+        self.category = self.columns.index(category)
+        self.stats = RunningStats(len(self.columns))
+        self.sample = Reservoir(sample_size, seed)
+        self.categories = np.empty(0)
+
+    def _observe(self, batch):
+        batch = np.asarray(batch, dtype=np.float64)
+        self.stats.update(batch)
+        origin = batch[:, self.category]
+        self.categories = np.union1d(self.categories, origin[~np.isnan(origin)])
+        return batch
+
+    def fit(self, values):
+        values = self._observe(values)
+        return self._finish(_nanmedian(values))
+
+    def partial_fit(self, batch):
+        batch = self._observe(batch)
+        self.sample.add(len(batch), rows=batch)
+        return self
+
+    def merge(self, other):
+        self.stats.merge(other.stats)
+        self.sample.merge(other.sample)
+        self.categories = np.union1d(self.categories, other.categories)
+        return self
+
+    def finish(self):
+        _, rows = self.sample.result()
+        return self._finish(_nanmedian(rows if rows is not None else np.empty((0, len(self.columns)))))
+
+    def fit_batches(self, batches):
+        for batch in batches:
+            self.partial_fit(batch)
+        return self.finish()
+
+    def _finish(self, fill):
+        self.fill = np.where(np.isnan(fill), 0.0, fill)
+        filled = self.stats.filled(self.fill)
+        self.min, self.max = filled.min, filled.max
+        self.mean, self.std = filled.mean, filled.std
+        # Сталі колонки діляться на 1 і дають нулі замість NaN/inf
+        self.range_scale = safe_scale(filled.ptp)
+        self.std_scale = safe_scale(self.std)
+        return self
+
+    @property
+    def one_hot_names(self):
+        name = self.columns[self.category]
+        return [f"{name}_{c:g}" for c in self.categories]
+
+    def impute(self, batch, out=None):
+        # out=batch — заповнення на місці
+        out = np.empty(batch.shape) if out is None else out
+        if out is not batch:
+            np.copyto(out, batch)
+        np.copyto(out, self.fill, where=np.isnan(out))
+        return out
+
+    def normalize(self, batch, out=None):
+        out = self.impute(batch, out)
+        np.subtract(out, self.min, out=out)
+        np.divide(out, self.range_scale, out=out)
+        return out
+
+    def standardize(self, batch, out=None):
+        out = self.impute(batch, out)
+        np.subtract(out, self.mean, out=out)
+        np.divide(out, self.std_scale, out=out)
+        return out
+
+    def transform(self, batch, norm_out=None, std_out=None):
+        # Пропуски заповнюються один раз, обидві шкали — з того самого буфера
+        norm_out = self.impute(batch, norm_out)
+        std_out = np.empty(batch.shape) if std_out is None else std_out
+        np.subtract(norm_out, self.mean, out=std_out)
+        np.divide(std_out, self.std_scale, out=std_out)
+        np.subtract(norm_out, self.min, out=norm_out)
+        np.divide(norm_out, self.range_scale, out=norm_out)
+        return norm_out, std_out
+
+    def one_hot(self, batch, out=None):
+        # Коди категорій через searchsorted по відомих значеннях; невідоме — рядок нулів
+        origin = batch[:, self.category]
+        out = np.zeros((len(batch), len(self.categories)), dtype=np.uint8) if out is None else out
+        out[:] = 0
+        codes = np.minimum(np.searchsorted(self.categories, origin), len(self.categories) - 1)
+        known = np.flatnonzero(self.categories[codes] == origin)
+        out[known, codes[known]] = 1
+        return out
+
+    def transform_batches(self, batches, batch_size=BATCH_ROWS):
+        # Буфери виділяються один раз і перевикористовуються між пакетами:
+        # споживач має скопіювати результат, якщо зберігає його
+        width = len(self.columns)
+        norm_buf, std_buf = np.empty((batch_size, width)), np.empty((batch_size, width))
+        hot_buf = np.empty((batch_size, len(self.categories)), dtype=np.uint8)
+        for batch in batches:
+            n = len(batch)
+            if n > batch_size:
+                raise ValueError(f"Пакет {n} рядків більший за буфер {batch_size}")
+            norm, std = self.transform(batch, norm_buf[:n], std_buf[:n])
+            yield norm, std, self.one_hot(batch, hot_buf[:n])
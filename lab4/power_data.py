@@ -0,0 +1,58 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "household_power_consumption.txt")
+NUMERIC_COLS = [
+    "Global_active_power", "Global_reactive_power", "Voltage",
+    "Global_intensity", "Sub_metering_1", "Sub_metering_2", "Sub_metering_3"
+]
+DATE_FORMAT = "%d/%m/%Y"
+CHUNK_SIZE = 500_000
+
+# Числа одразу в float32, "?" -> NaN під час розбору; рядковими лишаються тільки Date/Time
+_READ_OPTS = dict(
+    sep=";",
+    na_values="?",
+    keep_default_na=False,
+    usecols=["Date", "Time"] + NUMERIC_COLS,
+    dtype={col: np.float32 for col in NUMERIC_COLS},
+    engine="c",
+)
+
+
+def _parse_repeated(values, parse):
+    # Дат у файлі ~1440 на кожне значення, часів — 1440 різних: розбираємо
+    # лише унікальні рядки і розносимо за кодами
+    codes, uniques = pd.factorize(values)
+    return parse(uniques)[codes]
+
+
+def _prepare_chunk(chunk):
+    chunk = chunk.dropna()
+    # Фіксований формат замість dayfirst=True і без склеювання рядків Date + " " + Time
+    dates = _parse_repeated(chunk["Date"], lambda u: pd.to_datetime(u, format=DATE_FORMAT).to_numpy())
+    times = _parse_repeated(chunk["Time"], lambda u: pd.to_timedelta(u).to_numpy())
+    out = chunk[NUMERIC_COLS]
+    out.insert(0, "DateTime", dates + times)
+    return out
+
+
+def iter_power_chunks(path=DATA_PATH, chunksize=CHUNK_SIZE):
+    # Рядки Date/Time існують лише в межах одного блоку
+    with pd.read_csv(path, chunksize=chunksize, **_READ_OPTS) as reader:
+        for chunk in reader:
+            yield _prepare_chunk(chunk)
+
+
+def read_power(path=DATA_PATH, chunksize=CHUNK_SIZE):
+    frames = list(iter_power_chunks(path, chunksize))
+    return pd.concat(frames, ignore_index=True) if frames else _prepare_chunk(
+        pd.read_csv(path, nrows=0, **_READ_OPTS))
+
+
+def filter_power(predicate, path=DATA_PATH, chunksize=CHUNK_SIZE):
+    # Фільтр без завантаження всього файлу: у пам'яті лише блок і відібрані рядки
+    parts = [chunk[predicate(chunk)] for chunk in iter_power_chunks(path, chunksize)]
+    return pd.concat(parts, ignore_index=True)
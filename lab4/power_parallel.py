@@ -0,0 +1,167 @@
+import os
+import weakref
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import numpy as np
+
+from power_query import Query, col, hour, thin_halves
+from power_store import PowerStore
+from power_tasks import SUB_METERING, task4_sample
+
+_process_stores = {}
+_process_queries = {}
+
+
+def _process_store(store_dir):
+    # Процес відкриває сховище через mmap один раз і тримає запити по своїх шматках,
+    # щоб похідні колонки (година) не перераховувались на кожен виклик
+    store = _process_stores.get(store_dir)
+    if store is None:
+        store = _process_stores[store_dir] = PowerStore(store_dir)
+    return store
+
+
+def _store_shard_indices(store_dir, lo, hi, predicate):
+    query = _process_queries.get((store_dir, lo, hi))
+    if query is None:
+        store = _process_store(store_dir)
+        query = _process_queries[(store_dir, lo, hi)] = Query(
+            store.values[lo:hi], store.columns, store.minutes[lo:hi])
+    return query.indices(predicate) + lo
+
+
+def _store_shard_sums(store_dir, rows, cols):
+    return _shard_sums(_process_store(store_dir).values, rows, cols)
+
+
+def _shard_sums(values, rows, cols):
+    return values[rows][:, cols].sum(axis=0, dtype=np.float64), len(rows)
+
+
+def shard_bounds(n_rows, n_shards):
+    edges = np.linspace(0, n_rows, n_shards + 1).astype(np.int64)
+    return list(zip(edges[:-1], edges[1:]))
+
+
+class ShardedExecutor:
+    # Ділить часову вісь на неперервні шматки рядків і виконує їх у пулі.
+    # NumPy відпускає GIL на порівняннях і gather, тому потоків зазвичай досить;
+    # pool="process" для даних зі сховища (кожен процес сам робить mmap)
+    def __init__(self, values, minutes, columns, workers=None, n_shards=None, pool="thread", store_dir=None):
+        self.values = values
+        self.minutes = minutes
+        self.columns = list(columns)
+        self.workers = workers or os.cpu_count() or 1
+        self.bounds = shard_bounds(len(values), n_shards or self.workers)
+        self.store_dir = store_dir
+        if pool == "process":
+            if store_dir is None:
+                raise ValueError("Пул процесів потребує store_dir, щоб не копіювати масиви між процесами")
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+            self.queries = None
+        else:
+            self.pool = ThreadPoolExecutor(max_workers=self.workers)
+            self.queries = [Query(values[lo:hi], self.columns, None if minutes is None else minutes[lo:hi])
+                            for lo, hi in self.bounds]
+
+    @classmethod
+    def from_store(cls, store, **kwargs):
+        return cls(store.values, store.minutes, store.columns, store_dir=store.store_dir, **kwargs)
+
+    def close(self):
+        self.pool.shutdown()
+
+    def indices(self, predicate):
+        # Частини повертаються в порядку шматків, тому конкатенація зберігає порядок рядків
+        if self.queries is None:
+            futures = [self.pool.submit(_store_shard_indices, self.store_dir, lo, hi, predicate)
+                       for lo, hi in self.bounds]
+        else:
+            futures = [self.pool.submit(lambda q, lo: q.indices(predicate) + lo, q, lo)
+                       for q, (lo, _) in zip(self.queries, self.bounds)]
+        return np.concatenate([f.result() for f in futures])
+
+    def gather(self, rows):
+        out = np.empty((len(rows), self.values.shape[1]), dtype=self.values.dtype)
+        if isinstance(self.pool, ProcessPoolExecutor) or len(rows) < 2 * self.workers:
+            np.take(self.values, rows, axis=0, out=out)
+            return out
+
+        # Кожен потік заповнює свою ділянку вихідного масиву — рядки копіюються один раз
+        def fill(part):
+            lo, hi = part
+            np.take(self.values, rows[lo:hi], axis=0, out=out[lo:hi])
+
+        list(self.pool.map(fill, shard_bounds(len(rows), self.workers)))
+        return out
+
+    def select(self, predicate):
+        return self.gather(self.indices(predicate))
+
+    def select_halves(self, predicate, first_step, second_step):
+        return self.gather(thin_halves(self.indices(predicate), first_step, second_step))
+
+    def mean_of_rows(self, rows, columns):
+        # Зважене середнє: суми й кількості по шматках, потім sum(sums) / sum(counts)
+        rows = np.sort(rows)
+        cuts = np.searchsorted(rows, [hi for _, hi in self.bounds])
+        starts = np.concatenate([[0], cuts[:-1]])
+        cols = [self.columns.index(name) for name in columns]
+        if self.queries is None:
+            futures = [self.pool.submit(_store_shard_sums, self.store_dir, rows[s:e], cols)
+                       for s, e in zip(starts, cuts) if e > s]
+        else:
+            futures = [self.pool.submit(_shard_sums, self.values, rows[s:e], cols)
+                       for s, e in zip(starts, cuts) if e > s]
+        parts = [f.result() for f in futures]
+        total = np.sum([p[0] for p in parts], axis=0)
+        count = sum(p[1] for p in parts)
+        return (total / count).astype(self.values.dtype)
+
+
+_executors = weakref.WeakKeyDictionary()
+
+
+def executor_for(data):
+    # Один пул на набір даних; він зупиняється, коли набір даних зібрано GC.
+    # Без очікування потоків — фіналізатор може спрацювати в одному з них
+    executor = _executors.get(data)
+    if executor is None:
+        executor = _executors[data] = ShardedExecutor(data.values, data.minutes, data.columns)
+        weakref.finalize(data, executor.pool.shutdown, wait=False)
+    return executor
+
+
+# === Паралельні варіанти завдань (результати збігаються з NumPy-варіантами) ===
+def task1_parallel(data):
+    return executor_for(data).select(col("Global_active_power") > 5)
+
+def task2_parallel(data):
+    return executor_for(data).select(col("Voltage") > 235)
+
+def task3_parallel(data):
+    return executor_for(data).select(
+        col("Global_intensity").between(19, 20) &
+        (col("Sub_metering_2") > col("Sub_metering_3"))
+    )
+
+def task4_parallel(data):
+    return executor_for(data).mean_of_rows(task4_sample(data), SUB_METERING)
+
+def task5_parallel(data):
+    predicate = (
+        (hour() >= 18) &
+        (col("Global_active_power") > 6) &
+        (col("Sub_metering_2") > col("Sub_metering_1")) &
+        (col("Sub_metering_2") > col("Sub_metering_3"))
+    )
+    return executor_for(data).select_halves(predicate, 3, 4)
+
+
+PARALLEL_TASKS = {
+    "task1": task1_parallel,
+    "task2": task2_parallel,
+    "task3": task3_parallel,
+    "task4": task4_parallel,
+    "task5": task5_parallel,
+}
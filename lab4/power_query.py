@@ -0,0 +1,117 @@
+import numpy as np
+
+_OPS = {
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+
+class Predicate:
+    def __and__(self, other):
+        return BoolOp("and", [self, other])
+
+    def __or__(self, other):
+        return BoolOp("or", [self, other])
+
+
+class Compare(Predicate):
+    def __init__(self, left, op, right):
+        self.left, self.op, self.right = left, op, right
+
+    def evaluate(self, query, out):
+        right = query.column(self.right.name) if isinstance(self.right, Col) else self.right
+        _OPS[self.op](query.column(self.left.name), right, out=out)
+        return out
+
+
+class BoolOp(Predicate):
+    def __init__(self, kind, terms):
+        # (a & b) & c -> один список термів: одна проміжна маска на весь вираз
+        flat = []
+        for term in terms:
+            flat.extend(term.terms if isinstance(term, BoolOp) and term.kind == kind else [term])
+        self.kind, self.terms = kind, flat
+
+    def evaluate(self, query, out):
+        self.terms[0].evaluate(query, out)
+        scratch = np.empty_like(out)
+        combine = np.logical_and if self.kind == "and" else np.logical_or
+        for term in self.terms[1:]:
+            combine(out, term.evaluate(query, scratch), out=out)
+        return out
+
+
+class Col:
+    def __init__(self, name):
+        self.name = name
+
+    def _cmp(self, op, other):
+        return Compare(self, op, other)
+
+    __gt__ = lambda self, other: self._cmp(">", other)
+    __ge__ = lambda self, other: self._cmp(">=", other)
+    __lt__ = lambda self, other: self._cmp("<", other)
+    __le__ = lambda self, other: self._cmp("<=", other)
+    __eq__ = lambda self, other: self._cmp("==", other)
+    __ne__ = lambda self, other: self._cmp("!=", other)
+    __hash__ = object.__hash__
+
+    def between(self, low, high):
+        return (self >= low) & (self <= high)
+
+
+def col(name):
+    return Col(name)
+
+
+def hour():
+    return Col("hour")
+
+
+class Query:
+    # Предикати компілюються в одну булеву маску (плюс одна робоча для AND/OR),
+    # результат збирається одним gather за індексами — без проміжних копій рядків.
+    # Похідні колонки (година) обчислюються один раз на об'єкт
+    def __init__(self, values, columns, minutes=None):
+        self.values = values
+        self.idx = {name: i for i, name in enumerate(columns)}
+        self.minutes = minutes
+        self._derived = {}
+
+    def _derive(self, name):
+        if name == "hour":
+            if self.minutes is None:
+                raise ValueError("Для колонки 'hour' потрібні часові мітки")
+            return ((self.minutes // 60) % 24).astype(np.uint8)
+        raise KeyError(name)
+
+    def column(self, name):
+        if name in self.idx:
+            return self.values[:, self.idx[name]]
+        if name not in self._derived:
+            self._derived[name] = self._derive(name)
+        return self._derived[name]
+
+    def mask(self, predicate):
+        out = np.empty(len(self.values), dtype=bool)
+        return predicate.evaluate(self, out)
+
+    def indices(self, predicate):
+        return np.flatnonzero(self.mask(predicate))
+
+    def select(self, predicate):
+        return self.values[self.indices(predicate)]
+
+    def select_halves(self, predicate, first_step, second_step):
+        return self.values[thin_halves(self.indices(predicate), first_step, second_step)]
+
+
+def thin_halves(rows, first_step, second_step):
+    # Перша половина відібраних рядків з кроком first_step, друга — second_step;
+    # проріджуються індекси, рядки копіюються один раз
+    mid = len(rows) // 2
+    return np.concatenate([rows[:mid][::first_step], rows[mid:][::second_step]])
@@ -0,0 +1,235 @@
+import os
+import weakref
+
+import numpy as np
+
+from power_query import Query, col, thin_halves
+from power_sampling import time_strata
+from power_store import PowerStore, read_meta, write_meta
+
+ROLLUP_VERSION = 1
+ROLLUP_UNITS = ("h", "D", "M")
+ROLLUP_DIR = "rollups"
+CHUNK_ROWS = 1_000_000
+
+
+class RollupTable:
+    # Один рядок на часовий відрізок (година / день / місяць): номер відрізка,
+    # перший сирий рядок і кількість хвилин, sum/min/max по кожній колонці.
+    # Сирі рядки впорядковані за часом, тому відрізок — неперервний діапазон рядків
+    def __init__(self, unit, columns, bucket, start, count, sums, mins, maxs):
+        self.unit = unit
+        self.columns = list(columns)
+        self.idx = {name: i for i, name in enumerate(self.columns)}
+        self.bucket, self.start, self.count = bucket, start, count
+        self.sums, self.mins, self.maxs = sums, mins, maxs
+
+    @classmethod
+    def empty(cls, unit, columns):
+        width = len(columns)
+        return cls(unit, columns, np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.int64),
+                   np.empty((0, width)), np.empty((0, width), np.float32), np.empty((0, width), np.float32))
+
+    @classmethod
+    def aggregate(cls, unit, columns, values, minutes, offset=0):
+        bucket = time_strata(np.asarray(minutes), unit)
+        if len(bucket) == 0:
+            return cls.empty(unit, columns)
+        steps = np.diff(bucket)
+        if (steps < 0).any():
+            raise ValueError("Рядки мають бути впорядковані за часом")
+        starts = np.concatenate([[0], np.flatnonzero(steps) + 1])
+        return cls(unit, columns, bucket[starts], starts + offset, np.diff(np.append(starts, len(bucket))),
+                   np.add.reduceat(values, starts, axis=0, dtype=np.float64),
+                   np.minimum.reduceat(values, starts, axis=0),
+                   np.maximum.reduceat(values, starts, axis=0))
+
+    def __len__(self):
+        return len(self.bucket)
+
+    def merge(self, other):
+        # Останній відрізок може продовжуватись у доданих рядках — зливаємо його
+        if len(self) == 0:
+            return other
+        if len(other) == 0:
+            return self
+        if other.bucket[0] < self.bucket[-1]:
+            raise ValueError("Рядки мають бути впорядковані за часом")
+        head = self
+        if other.bucket[0] == self.bucket[-1]:
+            head = RollupTable(self.unit, self.columns, self.bucket, self.start, self.count.copy(),
+                               self.sums.copy(), self.mins.copy(), self.maxs.copy())
+            head.count[-1] += other.count[0]
+            head.sums[-1] += other.sums[0]
+            np.minimum(head.mins[-1], other.mins[0], out=head.mins[-1])
+            np.maximum(head.maxs[-1], other.maxs[0], out=head.maxs[-1])
+            other = RollupTable(other.unit, other.columns, *(a[1:] for a in other.arrays()))
+        return RollupTable(self.unit, self.columns,
+                           *(np.concatenate([a, b]) for a, b in zip(head.arrays(), other.arrays())))
+
+    def arrays(self):
+        return self.bucket, self.start, self.count, self.sums, self.mins, self.maxs
+
+    def stat(self, kind, name):
+        i = self.idx[name]
+        if kind == "sum":
+            return self.sums[:, i]
+        if kind == "mean":
+            return self.sums[:, i] / self.count
+        if kind == "min":
+            return self.mins[:, i]
+        if kind == "max":
+            return self.maxs[:, i]
+        if kind == "count":
+            return self.count
+        raise ValueError(f"Невідома статистика: {kind}")
+
+    @property
+    def hour_of_day(self):
+        if self.unit != "h":
+            raise ValueError("Година доби є лише в погодинній таблиці")
+        return self.bucket % 24
+
+    @property
+    def starts_at(self):
+        # Початок відрізка як datetime64[m]
+        if self.unit == "M":
+            return self.bucket.astype("datetime64[M]").astype("datetime64[m]")
+        return (self.bucket * (1440 if self.unit == "D" else 60)).astype("datetime64[m]")
+
+    def rows(self, mask):
+        # Сирі рядки вибраних відрізків — конкатенація діапазонів без циклу
+        starts, counts = self.start[mask], self.count[mask]
+        offsets = np.cumsum(counts) - counts
+        return np.arange(counts.sum(), dtype=np.int64) + np.repeat(starts - offsets, counts)
+
+
+class Rollups:
+    # Погодинні, денні і місячні агрегати над сирими рядками (n, 7).
+    # update() дораховує лише рядки, додані після останнього оновлення
+    def __init__(self, values, minutes, columns, tables=None, rows=0, last_minute=None):
+        self.values = values
+        self.minutes = minutes
+        self.columns = list(columns)
+        self.tables = tables or {unit: RollupTable.empty(unit, self.columns) for unit in ROLLUP_UNITS}
+        self.rows = rows
+        self.last_minute = last_minute
+
+    @classmethod
+    def build(cls, values, minutes, columns, chunksize=CHUNK_ROWS):
+        return cls(values, minutes, columns).update(chunksize=chunksize)
+
+    def update(self, values=None, minutes=None, chunksize=CHUNK_ROWS):
+        if values is not None:
+            self.values, self.minutes = values, minutes
+        n = len(self.minutes)
+        # Сирі дані перебудовано (а не дописано) — рахуємо все заново
+        if n < self.rows or (self.rows and int(self.minutes[self.rows - 1]) != self.last_minute):
+            self.tables = {unit: RollupTable.empty(unit, self.columns) for unit in ROLLUP_UNITS}
+            self.rows = 0
+        for lo in range(self.rows, n, chunksize):
+            values, minutes = self.values[lo:lo + chunksize], self.minutes[lo:lo + chunksize]
+            for unit in ROLLUP_UNITS:
+                self.tables[unit] = self.tables[unit].merge(
+                    RollupTable.aggregate(unit, self.columns, values, minutes, offset=lo))
+        self.rows = n
+        self.last_minute = int(self.minutes[-1]) if n else None
+        return self
+
+    def select(self, predicate, bucket_mask, unit="h"):
+        # Спершу відрізки з агрегатів, потім предикат лише по їхніх сирих рядках
+        rows = self.tables[unit].rows(bucket_mask)
+        if len(rows) == 0:
+            return rows
+        query = Query(self.values[rows], self.columns, self.minutes[rows])
+        return rows[query.mask(predicate)]
+
+    # === Збереження поряд із сирими даними сховища ===
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for unit, table in self.tables.items():
+            tmp_path = os.path.join(directory, f"{unit}.npz.tmp")
+            with open(tmp_path, "wb") as f:
+                np.savez(f, **dict(zip(("bucket", "start", "count", "sums", "mins", "maxs"), table.arrays())))
+            os.replace(tmp_path, os.path.join(directory, f"{unit}.npz"))
+        write_meta(directory, {"version": ROLLUP_VERSION, "columns": self.columns,
+                               "rows": self.rows, "last_minute": self.last_minute})
+
+    @classmethod
+    def load(cls, directory, values, minutes, columns):
+        meta = read_meta(directory)
+        if meta is None or meta.get("version") != ROLLUP_VERSION or meta.get("columns") != list(columns):
+            return None
+        tables = {}
+        for unit in ROLLUP_UNITS:
+            with np.load(os.path.join(directory, f"{unit}.npz")) as f:
+                tables[unit] = RollupTable(unit, columns, f["bucket"], f["start"], f["count"],
+                                           f["sums"], f["mins"], f["maxs"])
+        return cls(values, minutes, columns, tables, meta["rows"], meta["last_minute"])
+
+
+def open_rollups(store):
+    # Агрегати лежать у <сховище>/rollups; після дописування рядків
+    # оновлюються лише хвости таблиць
+    directory = os.path.join(store.store_dir, ROLLUP_DIR)
+    rollups = Rollups.load(directory, store.values, store.minutes, store.columns)
+    before = None
+    if rollups is None:
+        rollups = Rollups(store.values, store.minutes, store.columns)
+    else:
+        before = (rollups.rows, rollups.last_minute)
+    if rollups.update().rows == 0 or (rollups.rows, rollups.last_minute) != before:
+        rollups.save(directory)
+    return rollups
+
+
+_rollups = weakref.WeakKeyDictionary()
+
+
+def rollups_for(data):
+    if data not in _rollups:
+        if data.store_dir is not None:
+            _rollups[data] = open_rollups(PowerStore(data.store_dir))
+        else:
+            _rollups[data] = Rollups.build(data.values, data.minutes, data.columns)
+    return _rollups[data]
+
+
+# === Завдання через агрегати: відрізки за min/max, потім сирі рядки ===
+def task1_rollup(data):
+    rollups = rollups_for(data)
+    hourly = rollups.tables["h"]
+    return data.values[rollups.select(col("Global_active_power") > 5,
+                                      hourly.stat("max", "Global_active_power") > 5)]
+
+def task2_rollup(data):
+    rollups = rollups_for(data)
+    hourly = rollups.tables["h"]
+    return data.values[rollups.select(col("Voltage") > 235, hourly.stat("max", "Voltage") > 235)]
+
+def task3_rollup(data):
+    rollups = rollups_for(data)
+    hourly = rollups.tables["h"]
+    buckets = (hourly.stat("max", "Global_intensity") >= 19) & (hourly.stat("min", "Global_intensity") <= 20)
+    return data.values[rollups.select(
+        col("Global_intensity").between(19, 20) & (col("Sub_metering_2") > col("Sub_metering_3")), buckets)]
+
+def task5_rollup(data):
+    # Година береться з номера відрізка, а не з DateTime кожного рядка
+    rollups = rollups_for(data)
+    hourly = rollups.tables["h"]
+    buckets = (hourly.hour_of_day >= 18) & (hourly.stat("max", "Global_active_power") > 6)
+    predicate = (
+        (col("Global_active_power") > 6) &
+        (col("Sub_metering_2") > col("Sub_metering_1")) &
+        (col("Sub_metering_2") > col("Sub_metering_3"))
+    )
+    return data.values[thin_halves(rollups.select(predicate, buckets), 3, 4)]
+
+
+ROLLUP_TASKS = {
+    "task1": task1_rollup,
+    "task2": task2_rollup,
+    "task3": task3_rollup,
+    "task5": task5_rollup,
+}
@@ -0,0 +1,185 @@
+import numpy as np
+
+SAMPLE_SEED = 42
+CHUNK_ROWS = 1_000_000
+
+
+def _lengths(n, chunksize):
+    for start in range(0, n, chunksize):
+        yield min(chunksize, n - start)
+
+
+def _array_chunks(array, chunksize):
+    for start in range(0, len(array), chunksize):
+        yield array[start:start + chunksize]
+
+
+class Reservoir:
+    # Bottom-k: кожен рядок отримує ключ U(0,1) з одного потоку генератора,
+    # вибірка — k найменших ключів (у межах кожної страти — свої quotas[s]).
+    # Ключі беруться послідовно, тому розбиття на блоки не змінює результат:
+    # масив у пам'яті і потік блоків дають ту саму вибірку
+    def __init__(self, quotas, seed=SAMPLE_SEED):
+        self.quotas = np.atleast_1d(np.asarray(quotas, dtype=np.int64))
+        self.rng = np.random.default_rng(seed)
+        self.seen = 0
+        self.indices = np.empty(0, dtype=np.int64)
+        self.keys = np.empty(0)
+        self.strata = np.empty(0, dtype=np.int64)
+        self.rows = None
+        self.thresholds = np.full(len(self.quotas), np.inf)
+
+    def add(self, n_rows, rows=None, strata=None):
+        keys = self.rng.random(n_rows)
+        if strata is None:
+            strata = np.zeros(n_rows, dtype=np.int64)
+        # Рядки з ключем не меншим за поріг заповненої страти вже не потраплять у вибірку
+        fresh = np.flatnonzero(keys < self.thresholds[strata])
+        self.seen += n_rows
+        if len(fresh) == 0:
+            return self
+
+        indices = np.concatenate([self.indices, fresh + (self.seen - n_rows)])
+        keys = np.concatenate([self.keys, keys[fresh]])
+        strata = np.concatenate([self.strata, strata[fresh]])
+        if len(self.quotas) == 1:
+            k = self.quotas[0]
+            keep = np.argpartition(keys, k - 1)[:k] if 0 < k < len(keys) else np.arange(min(k, len(keys)))
+        else:
+            order = np.lexsort((keys, strata))
+            sorted_strata = strata[order]
+            rank = np.arange(len(order)) - np.searchsorted(sorted_strata, sorted_strata)
+            keep = order[rank < self.quotas[sorted_strata]]
+
+        if rows is not None:
+            candidates = rows[fresh] if self.rows is None else np.concatenate([self.rows, rows[fresh]])
+            self.rows = candidates[keep]
+        self.indices, self.keys, self.strata = indices[keep], keys[keep], strata[keep]
+
+        top = np.full(len(self.quotas), -np.inf)
+        np.maximum.at(top, self.strata, self.keys)
+        full = np.bincount(self.strata, minlength=len(self.quotas)) >= self.quotas
+        self.thresholds = np.where(full, top, np.inf)
+        return self
+
+    def merge(self, other):
+        # Злиття резервуарів двох послідовних частин потоку (шматки, воркери з різними seed):
+        # k найменших ключів з обох — знову рівномірна вибірка; лише без страт
+        if len(self.quotas) != 1 or len(other.quotas) != 1:
+            raise ValueError("Зливати можна лише резервуари без страт")
+        keys = np.concatenate([self.keys, other.keys])
+        keep = np.argsort(keys, kind="stable")[:self.quotas[0]]
+        if self.rows is not None or other.rows is not None:
+            self.rows = np.concatenate([r for r in (self.rows, other.rows) if r is not None])[keep]
+        self.indices = np.concatenate([self.indices, other.indices + self.seen])[keep]
+        self.keys, self.strata = keys[keep], np.zeros(len(keep), dtype=np.int64)
+        self.seen += other.seen
+        full = len(self.keys) >= self.quotas[0]
+        self.thresholds = np.array([self.keys.max() if full and len(self.keys) else np.inf])
+        return self
+
+    def result(self):
+        order = np.argsort(self.indices)
+        rows = None if self.rows is None else self.rows[order]
+        return self.indices[order], rows
+
+
+# === Простий випадковий відбір ===
+def reservoir_indices(n, k, seed=SAMPLE_SEED, chunksize=CHUNK_ROWS):
+    # Пам'ять — O(k + chunksize) замість перестановки на всі n рядків
+    reservoir = Reservoir(min(k, n), seed)
+    for length in _lengths(n, chunksize):
+        reservoir.add(length)
+    return reservoir.result()[0]
+
+
+def reservoir_sample(chunks, k, seed=SAMPLE_SEED):
+    # Для потоку блоків невідомої довжини (наприклад, з текстового файлу):
+    # повертає відсортовані глобальні індекси і самі рядки
+    reservoir = Reservoir(k, seed)
+    for chunk in chunks:
+        chunk = np.asarray(chunk)
+        reservoir.add(len(chunk), rows=chunk)
+    return reservoir.result()
+
+
+def floyd_indices(n, k, seed=SAMPLE_SEED):
+    # Алгоритм Флойда: k різних індексів з [0, n) за O(k) пам'яті і k випадкових чисел
+    if k > n:
+        raise ValueError(f"Вибірка {k} більша за кількість рядків {n}")
+    rng = np.random.default_rng(seed)
+    upper = np.arange(n - k, n, dtype=np.int64)
+    draws = (rng.random(k) * (upper + 1)).astype(np.int64).tolist()
+    chosen = set()
+    for j, t in zip(upper.tolist(), draws):
+        chosen.add(j if t in chosen else t)
+    return np.fromiter(sorted(chosen), dtype=np.int64, count=k)
+
+
+# === Стратифікований за часом відбір ===
+def time_strata(minutes, unit="M"):
+    # Номер страти для хвилин від епохи: "M" — місяць, "D" — день, "h" — година
+    if unit == "M":
+        return minutes.view("datetime64[m]").astype("datetime64[M]").astype(np.int64)
+    if unit == "D":
+        return minutes // 1440
+    if unit == "h":
+        return minutes // 60
+    raise ValueError(f"Невідома одиниця страти: {unit}")
+
+
+def allocate(counts, k):
+    # Пропорційний розподіл k між стратами методом найбільших залишків
+    counts = np.asarray(counts, dtype=np.int64)
+    total = counts.sum()
+    if k > total:
+        raise ValueError(f"Вибірка {k} більша за кількість рядків {total}")
+    exact = counts * (k / total) if total else np.zeros(len(counts))
+    quotas = np.floor(exact).astype(np.int64)
+    short = k - quotas.sum()
+    if short:
+        quotas[np.argsort(quotas - exact, kind="stable")[:short]] += 1
+    return np.minimum(quotas, counts)
+
+
+def stratified_indices(minutes, k, seed=SAMPLE_SEED, unit="M", chunksize=CHUNK_ROWS):
+    # Два проходи блоками по часових мітках (підходить і memmap зі сховища):
+    # перший рахує рядки в стратах, другий — bottom-k у кожній страті
+    first = last = None
+    for chunk in _array_chunks(minutes, chunksize):
+        strata = time_strata(chunk, unit)
+        first = strata.min() if first is None else min(first, strata.min())
+        last = strata.max() if last is None else max(last, strata.max())
+    if first is None:
+        return np.empty(0, dtype=np.int64)
+
+    counts = np.zeros(last - first + 1, dtype=np.int64)
+    for chunk in _array_chunks(minutes, chunksize):
+        counts += np.bincount(time_strata(chunk, unit) - first, minlength=len(counts))
+
+    reservoir = Reservoir(allocate(counts, k), seed)
+    for chunk in _array_chunks(minutes, chunksize):
+        reservoir.add(len(chunk), strata=time_strata(chunk, unit) - first)
+    return reservoir.result()[0]
+
+
+# === Вибірка рядків і середні ===
+def take_sorted(source, indices):
+    # Рядки за відсортованими індексами з масиву/memmap або з потоку блоків
+    if isinstance(source, np.ndarray):
+        return source[indices]
+    parts, offset = [], 0
+    for chunk in source:
+        chunk = np.asarray(chunk)
+        lo, hi = np.searchsorted(indices, [offset, offset + len(chunk)])
+        parts.append(chunk[indices[lo:hi] - offset])
+        offset += len(chunk)
+    return np.concatenate(parts) if parts else np.empty((0,))
+
+
+def sample_mean(values, indices, cols, chunksize=CHUNK_ROWS):
+    # Середнє по вибірці блоками індексів: з memmap читаються лише потрібні сторінки
+    total = np.zeros(len(cols))
+    for part in _array_chunks(indices, chunksize):
+        total += values[part][:, cols].sum(axis=0, dtype=np.float64)
+    return (total / max(len(indices), 1)).astype(values.dtype)
@@ -0,0 +1,129 @@
+import json
+import os
+
+import numpy as np
+
+from power_data import NUMERIC_COLS, CHUNK_SIZE, iter_power_chunks
+
+STORE_VERSION = 1
+VALUES_FILE = "values.f32"
+MINUTES_FILE = "minutes.i64"
+META_FILE = "meta.json"
+
+
+def default_store_dir(txt_path):
+    return os.path.splitext(txt_path)[0] + ".store"
+
+
+def _source_info(txt_path):
+    st = os.stat(txt_path)
+    return {"path": os.path.basename(txt_path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def read_meta(store_dir):
+    path = os.path.join(store_dir, META_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_meta(store_dir, meta):
+    tmp_path = os.path.join(store_dir, META_FILE + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, os.path.join(store_dir, META_FILE))
+
+
+def to_epoch_minutes(datetimes):
+    return np.asarray(datetimes).astype("datetime64[m]").astype(np.int64)
+
+
+def convert(txt_path, store_dir=None, chunksize=CHUNK_SIZE):
+    # Одноразова конвертація: рядки (n, 7) float32 + int64 хвилини від епохи
+    # у сирих файлах, форма і типи — у meta.json. Пишемо блоками, тому
+    # пам'ять не залежить від розміру файлу
+    store_dir = store_dir or default_store_dir(txt_path)
+    os.makedirs(store_dir, exist_ok=True)
+    rows = 0
+    with open(os.path.join(store_dir, VALUES_FILE), "wb") as fv, \
+            open(os.path.join(store_dir, MINUTES_FILE), "wb") as fm:
+        for chunk in iter_power_chunks(txt_path, chunksize):
+            fv.write(np.ascontiguousarray(chunk[NUMERIC_COLS].to_numpy(dtype=np.float32)).tobytes())
+            fm.write(to_epoch_minutes(chunk["DateTime"].to_numpy()).tobytes())
+            rows += len(chunk)
+
+    write_meta(store_dir, {
+        "version": STORE_VERSION,
+        "columns": NUMERIC_COLS,
+        "rows": rows,
+        "values_dtype": "float32",
+        "minutes_dtype": "int64",
+        "source": _source_info(txt_path),
+    })
+    return store_dir
+
+
+class PowerStore:
+    # Відкриття — лише mmap двох файлів, без розбору й копіювання
+    def __init__(self, store_dir):
+        meta = read_meta(store_dir)
+        if meta is None or meta.get("version") != STORE_VERSION:
+            raise ValueError(f"Немає сховища або інша версія формату: {store_dir}")
+        self.store_dir = store_dir
+        self.meta = meta
+        self.columns = meta["columns"]
+        self.idx = {col: i for i, col in enumerate(self.columns)}
+        rows = meta["rows"]
+        self.values = self._map(VALUES_FILE, meta["values_dtype"], (rows, len(self.columns)))
+        self.minutes = self._map(MINUTES_FILE, meta["minutes_dtype"], (rows,))
+
+    def _map(self, name, dtype, shape):
+        if shape[0] == 0:
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(os.path.join(self.store_dir, name), dtype=dtype, mode="r", shape=shape)
+
+    def __len__(self):
+        return len(self.minutes)
+
+    @property
+    def datetimes(self):
+        # int64 хвилини переглядаються як datetime64[m] без копії
+        return self.minutes.view("datetime64[m]")
+
+    def column(self, name):
+        return self.values[:, self.idx[name]]
+
+
+def append(store, values, minutes):
+    # Нові хвилини дописуються в кінець файлів сховища; час має йти далі
+    values = np.ascontiguousarray(values, dtype=np.float32)
+    minutes = np.ascontiguousarray(minutes, dtype=np.int64)
+    if len(values) != len(minutes) or values.shape[1:] != (len(store.columns),):
+        raise ValueError("Форма нових рядків не відповідає сховищу")
+    if len(store) and len(minutes) and minutes[0] < store.minutes[-1]:
+        raise ValueError("Нові рядки мають іти після останньої хвилини сховища")
+    with open(os.path.join(store.store_dir, VALUES_FILE), "ab") as fv, \
+            open(os.path.join(store.store_dir, MINUTES_FILE), "ab") as fm:
+        fv.write(values.tobytes())
+        fm.write(minutes.tobytes())
+    write_meta(store.store_dir, dict(store.meta, rows=store.meta["rows"] + len(minutes)))
+    return PowerStore(store.store_dir)
+
+
+def is_fresh(txt_path, store_dir):
+    meta = read_meta(store_dir)
+    if meta is None or meta.get("version") != STORE_VERSION:
+        return False
+    if not os.path.exists(txt_path):
+        return True
+    return meta.get("source") == _source_info(txt_path)
+
+
+def open_store(txt_path, store_dir=None):
+    # Конвертуємо лише якщо сховища немає або текстовий файл змінився
+    store_dir = store_dir or default_store_dir(txt_path)
+    if not is_fresh(txt_path, store_dir):
+        print(f"Конвертація {os.path.basename(txt_path)} у {store_dir}...")
+        convert(txt_path, store_dir)
+    return PowerStore(store_dir)
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+from power_data import DATA_PATH, NUMERIC_COLS, iter_power_chunks
+from power_query import Query, col, hour
+from power_sampling import SAMPLE_SEED, reservoir_indices, reservoir_sample, sample_mean
+
+SAMPLE_SIZE = 500000
+
+
+class PowerData:
+    # Спільні входи для NumPy- і Pandas-варіантів завдань: масив (n, 7),
+    # хвилини від епохи, запит над масивом і ліниво створений DataFrame
+    def __init__(self, values, minutes, columns=NUMERIC_COLS, sample_size=SAMPLE_SIZE, store_dir=None):
+        self.values = values
+        self.minutes = minutes
+        self.columns = list(columns)
+        self.idx = {name: i for i, name in enumerate(self.columns)}
+        self.query = Query(values, self.columns, minutes)
+        self.sample_size = min(sample_size, len(values))
+        self.store_dir = store_dir
+        self._df = None
+
+    @classmethod
+    def from_store(cls, store, sample_size=SAMPLE_SIZE):
+        return cls(store.values, store.minutes, store.columns, sample_size, store.store_dir)
+
+    @property
+    def df(self):
+        if self._df is None:
+            df = pd.DataFrame(self.values, columns=self.columns, copy=False)
+            df.insert(0, "DateTime", self.minutes.view("datetime64[m]").astype("datetime64[s]"))
+            self._df = df
+        return self._df
+
+
+# === ЗАВДАННЯ 1: Потужність > 5 кВт ===
+def task1_pandas(data):
+    df = data.df
+    return df[df["Global_active_power"] > 5]
+
+def task1_numpy(data):
+    return data.query.select(col("Global_active_power") > 5)
+
+# === ЗАВДАННЯ 2: Напруга > 235 В ===
+def task2_pandas(data):
+    df = data.df
+    return df[df["Voltage"] > 235]
+
+def task2_numpy(data):
+    return data.query.select(col("Voltage") > 235)
+
+# === ЗАВДАННЯ 3: 19-20A та група 2 > групи 3 ===
+def task3_pandas(data):
+    df = data.df
+    mask = (df["Global_intensity"] >= 19) & (df["Global_intensity"] <= 20)
+    sub = df[mask]
+    return sub[sub["Sub_metering_2"] > sub["Sub_metering_3"]]
+
+def task3_numpy(data):
+    return data.query.select(
+        col("Global_intensity").between(19, 20) &
+        (col("Sub_metering_2") > col("Sub_metering_3"))
+    )
+
+# === ЗАВДАННЯ 4: Випадкові 500000 записів, середні значення ===
+# Обидва варіанти беруть ту саму вибірку: bottom-k резервуар з seeded Generator
+# замість перестановки на всі рядки (np.random.choice) і df.sample
+SUB_METERING = ["Sub_metering_1", "Sub_metering_2", "Sub_metering_3"]
+
+def task4_sample(data):
+    return reservoir_indices(len(data.values), data.sample_size, seed=SAMPLE_SEED)
+
+def task4_pandas(data):
+    return data.df.iloc[task4_sample(data)][SUB_METERING].mean()
+
+def task4_numpy(data):
+    return sample_mean(data.values, task4_sample(data), [data.idx[name] for name in SUB_METERING])
+
+def task4_stream(path=DATA_PATH, sample_size=SAMPLE_SIZE):
+    # Те саме для файлу, більшого за пам'ять: потік блоків, у пам'яті лише резервуар
+    chunks = (chunk[NUMERIC_COLS].to_numpy(dtype=np.float32) for chunk in iter_power_chunks(path))
+    _, rows = reservoir_sample(chunks, sample_size, seed=SAMPLE_SEED)
+    return sample_mean(rows, np.arange(len(rows)), [NUMERIC_COLS.index(name) for name in SUB_METERING])
+
+# === ЗАВДАННЯ 5: Після 18:00, потужність > 6, найбільша група 2, вибірки ===
+def task5_pandas(data):
+    df = data.df
+    after_6pm = df[df["DateTime"].dt.hour >= 18]
+    high_power = after_6pm[after_6pm["Global_active_power"] > 6]
+    group2_dominant = high_power[
+        (high_power["Sub_metering_2"] > high_power["Sub_metering_1"]) &
+        (high_power["Sub_metering_2"] > high_power["Sub_metering_3"])
+    ]
+    mid = len(group2_dominant) // 2
+    first_half = group2_dominant.iloc[:mid].iloc[::3]
+    second_half = group2_dominant.iloc[mid:].iloc[::4]
+    return pd.concat([first_half, second_half])
+
+def task5_numpy(data):
+    predicate = (
+        (hour() >= 18) &
+        (col("Global_active_power") > 6) &
+        (col("Sub_metering_2") > col("Sub_metering_1")) &
+        (col("Sub_metering_2") > col("Sub_metering_3"))
+    )
+    return data.query.select_halves(predicate, 3, 4)
+
+
+TASKS = {
+    "task1": (task1_numpy, task1_pandas),
+    "task2": (task2_numpy, task2_pandas),
+    "task3": (task3_numpy, task3_pandas),
+    "task4": (task4_numpy, task4_pandas),
+    "task5": (task5_numpy, task5_pandas),
+}
+
+
+def synthetic_power(n_rows, seed=0, start="2006-12-16T17:24"):
+    # Синтетичні похвилинні виміри з розподілами, близькими до реального файлу
+    rng = np.random.default_rng(seed)
+    values = np.empty((n_rows, len(NUMERIC_COLS)), dtype=np.float32)
+    values[:, 0] = rng.gamma(1.5, 1.0, n_rows)
+    values[:, 1] = rng.random(n_rows) * 0.5
+    values[:, 2] = 240 + rng.normal(0, 3, n_rows)
+    values[:, 3] = values[:, 0] * 4.3
+    values[:, 4:7] = rng.integers(0, 40, (n_rows, 3))
+    minutes = np.datetime64(start, "m").astype(np.int64) + np.arange(n_rows, dtype=np.int64)
+    return values, minutes
@@ -0,0 +1,79 @@
+import numpy as np
+
+
+def safe_scale(scale):
+    # Для сталих (ptp = 0, std = 0) або порожніх колонок ділимо на 1:
+    # результат — нулі, а не NaN/inf
+    scale = np.asarray(scale, dtype=np.float64)
+    return np.where((scale > 0) & np.isfinite(scale), scale, 1.0)
+
+
+class RunningStats:
+    # Моменти по колонках: count, mean, M2 (Велфорд/Чен) і поточні min/max.
+    # update() додає пакет, merge() точно зливає незалежні частини (шматки
+    # файлу, воркери) — результат не залежить від розбиття. NaN не враховуються
+    def __init__(self, width):
+        self.rows = 0
+        self.count = np.zeros(width, dtype=np.int64)
+        self.mean = np.zeros(width)
+        self.m2 = np.zeros(width)
+        self.min = np.full(width, np.inf)
+        self.max = np.full(width, -np.inf)
+
+    @classmethod
+    def of(cls, batch):
+        batch = np.asarray(batch, dtype=np.float64)
+        stats = cls(batch.shape[1])
+        if len(batch) == 0:
+            return stats
+        observed = ~np.isnan(batch)
+        count = observed.sum(axis=0)
+        total = np.where(observed, batch, 0.0).sum(axis=0)
+        mean = np.divide(total, count, out=np.zeros(len(count)), where=count > 0)
+        deviation = np.where(observed, batch - mean, 0.0)
+        stats.rows = len(batch)
+        stats.count, stats.mean = count, mean
+        stats.m2 = np.einsum("ij,ij->j", deviation, deviation)
+        stats.min = np.where(count > 0, np.fmin.reduce(batch, axis=0), np.inf)
+        stats.max = np.where(count > 0, np.fmax.reduce(batch, axis=0), -np.inf)
+        return stats
+
+    def update(self, batch):
+        return self.merge(RunningStats.of(batch))
+
+    def merge(self, other):
+        # Формула Чена: M2 = M2a + M2b + delta^2 * na * nb / n
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        share = np.divide(other.count, n, out=np.zeros(len(n)), where=n > 0)
+        self.mean = self.mean + delta * share
+        self.m2 = self.m2 + other.m2 + delta ** 2 * self.count * share
+        self.count = n
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        self.rows += other.rows
+        return self
+
+    def filled(self, fill):
+        # Статистики після заповнення пропусків значенням fill: пропуски
+        # зливаються як група з нульовою дисперсією, без ще одного проходу
+        fill = np.asarray(fill, dtype=np.float64)
+        gaps = RunningStats(len(self.count))
+        gaps.count = self.rows - self.count
+        gaps.mean = fill.copy()
+        gaps.min = np.where(gaps.count > 0, fill, np.inf)
+        gaps.max = np.where(gaps.count > 0, fill, -np.inf)
+        result = RunningStats(len(self.count))
+        return result.merge(self).merge(gaps)
+
+    @property
+    def var(self):
+        return np.divide(self.m2, self.count, out=np.full(len(self.count), np.nan), where=self.count > 0)
+
+    @property
+    def std(self):
+        return np.sqrt(self.var)
+
+    @property
+    def ptp(self):
+        return self.max - self.min
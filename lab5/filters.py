@@ -0,0 +1,87 @@
+from functools import lru_cache
+
+import numpy as np
+from scipy.ndimage import median_filter
+from scipy.signal import butter, savgol_filter, sosfilt, sosfiltfilt
+
+# Для вікон до цього розміру пряма згортка швидша за кумулятивні суми
+DIRECT_WINDOW = 12
+
+
+# === Ковзне середнє за O(n) ===
+def moving_average(signal, window, edge="shrink"):
+    # Центроване вікно, як np.convolve(..., mode='same'), але через кумулятивну суму:
+    # O(n) незалежно від вікна. edge="shrink" — на краях ділимо на кількість
+    # справжніх відліків у вікні (без просідання до нуля), edge="zero" — як convolve
+    signal = np.asarray(signal, dtype=np.float64)
+    n, window = len(signal), int(window)
+    if window <= 1 or n == 0:
+        return signal.copy()
+    left = window // 2
+    if window <= min(DIRECT_WINDOW, n):
+        # Для window > n convolve 'same' повертає window відліків, а не n
+        total = np.convolve(signal, np.ones(window), mode='same')
+    else:
+        # Суми вікон — різниця двох зсунутих зрізів кумулятивної суми; доповнення
+        # нулями зліва і повною сумою справа обрізає вікно на краях
+        csum = np.cumsum(signal)
+        padded = np.concatenate([np.zeros(left + 1), csum, np.full(window, csum[-1])])
+        total = padded[window:window + n] - padded[:n]
+    if edge == "zero":
+        return total / window
+    count = np.full(n, float(window))
+    edges = np.concatenate([np.arange(min(left, n)), np.arange(max(n - window + left + 1, 0), n)])
+    count[edges] = np.minimum(edges - left + window, n) - np.maximum(edges - left, 0)
+    return total / count
+
+
+# === Нелінійні і поліноміальні ===
+def median(signal, window):
+    return median_filter(np.asarray(signal, dtype=np.float64), size=max(int(window), 1), mode='nearest')
+
+
+def savgol_window(window, polyorder=2):
+    # Вікно Савицького–Голея має бути непарним і більшим за порядок полінома
+    return max(int(window) | 1, polyorder + 2 | 1)
+
+
+def savgol(signal, window, polyorder=2):
+    window = savgol_window(window, polyorder)
+    signal = np.asarray(signal, dtype=np.float64)
+    if window > len(signal):
+        return signal.copy()
+    return savgol_filter(signal, window, polyorder, mode='interp')
+
+
+# === IIR у формі секцій другого порядку ===
+@lru_cache(maxsize=32)
+def lowpass_sos(cutoff, order, fs):
+    # Коефіцієнти не залежать від сигналу — кеш за (cutoff, order, fs)
+    return butter(order, cutoff / (0.5 * fs), btype='low', output='sos')
+
+
+def lowpass(signal, cutoff, fs, order=4, zero_phase=True):
+    sos = lowpass_sos(float(cutoff), int(order), float(fs))
+    return sosfiltfilt(sos, signal) if zero_phase else sosfilt(sos, signal)
+
+
+# === Банк фільтрів з однаковим інтерфейсом (сигнал, вікно, частота дискретизації) ===
+def window_cutoff(window, fs):
+    # Вікно w відповідає частоті зрізу fs / (2w); вікно 1 — майже без фільтрації
+    return min(fs / (2 * max(int(window), 1)), 0.49 * fs)
+
+
+def _lowpass_window(signal, window, fs):
+    return lowpass(signal, window_cutoff(window, fs), fs)
+
+
+FILTERS = {
+    "Ковзне середнє": lambda signal, window, fs: moving_average(signal, window),
+    "Медіанний": lambda signal, window, fs: median(signal, window),
+    "Савицького–Голея": lambda signal, window, fs: savgol(signal, window),
+    "Баттерворт (IIR)": _lowpass_window,
+}
+
+
+def apply_filter(name, signal, window, fs):
+    return FILTERS[name](signal, window, fs)
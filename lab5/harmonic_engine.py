@@ -0,0 +1,119 @@
+import numpy as np
+from scipy.signal import sosfiltfilt
+
+from filters import lowpass_sos
+
+
+class DependencyGraph:
+    # Параметри і вузли з явними залежностями. Вузол перераховується лише коли
+    # змінився хоча б один його параметр або версія вузла, від якого він залежить;
+    # інакше віддається кешоване значення
+    def __init__(self, **params):
+        self.params = dict(params)
+        self.nodes = {}
+        self.cache = {}
+        self.versions = {}
+
+    def node(self, name, fn, params=(), deps=()):
+        self.nodes[name] = (fn, tuple(params), tuple(deps))
+        return self
+
+    def set(self, **params):
+        self.params.update(params)
+        return self
+
+    def get(self, name):
+        fn, params, deps = self.nodes[name]
+        dep_values = [self.get(dep) for dep in deps]
+        key = tuple(self.params[p] for p in params) + tuple(self.versions[dep] for dep in deps)
+        cached = self.cache.get(name)
+        if cached is None or cached[0] != key:
+            value = fn(*(self.params[p] for p in params), *dep_values)
+            self.cache[name] = (key, value)
+            self.versions[name] = self.versions.get(name, 0) + 1
+        return self.cache[name][1]
+
+
+class HarmonicModel:
+    # Ланцюжок залежностей гармоніки з шумом:
+    #   f            -> sin(wt), cos(wt)
+    #   phi + trig   -> sin(wt + phi) = sin(wt)cos(phi) + cos(wt)sin(phi)   (без тригонометрії по масиву)
+    #   A + sin_term -> чиста гармоніка
+    #   mean, std    -> шум = mean + std * base (base ~ N(0, 1) генерується один раз)
+    #   cutoff, order, fs -> секції Баттерворта (filters.lowpass_sos, кеш)
+    # filtfilt лінійний, тому фільтрується не сума, а її складові: sin(wt), cos(wt),
+    # base і одиниці. Тоді A, phi, mean і std змінюють фільтрований сигнал
+    # лише множенням і додаванням; filtfilt викликається при зміні f або фільтра
+    def __init__(self, t, A=1.0, f=1.0, phi=0.0, noise_mean=0.0, noise_std=0.2,
+                 cutoff=2.0, order=4, seed=None):
+        self.t = t
+        self.fs = 1 / (t[1] - t[0])
+        self.base = np.random.default_rng(seed).standard_normal(len(t))
+        self.graph = (
+            DependencyGraph(A=A, f=f, phi=phi, noise_mean=noise_mean, noise_std=noise_std,
+                            cutoff=cutoff, order=order, fs=self.fs)
+            .node("trig", self._trig, params=("f",))
+            .node("sin_term", self._sin_term, params=("phi",), deps=("trig",))
+            .node("pure", lambda A, s: A * s, params=("A",), deps=("sin_term",))
+            .node("noise", lambda mean, std: mean + std * self.base, params=("noise_mean", "noise_std"))
+            .node("signal", lambda pure, noise: pure + noise, deps=("pure", "noise"))
+            .node("sos", lowpass_sos, params=("cutoff", "order", "fs"))
+            .node("filtered_trig", lambda sos, trig: tuple(sosfiltfilt(sos, x) for x in trig),
+                  deps=("sos", "trig"))
+            .node("filtered_base", lambda sos: (sosfiltfilt(sos, self.base), sosfiltfilt(sos, np.ones(len(t)))),
+                  deps=("sos",))
+            .node("filtered", self._filtered, params=("A", "phi", "noise_mean", "noise_std"),
+                  deps=("filtered_trig", "filtered_base"))
+        )
+
+    def _trig(self, f):
+        wt = 2 * np.pi * f * self.t
+        return np.sin(wt), np.cos(wt)
+
+    @staticmethod
+    def _sin_term(phi, trig):
+        sin_wt, cos_wt = trig
+        return sin_wt * np.cos(phi) + cos_wt * np.sin(phi)
+
+    @classmethod
+    def _filtered(cls, A, phi, mean, std, filtered_trig, filtered_base):
+        base, ones = filtered_base
+        return A * cls._sin_term(phi, filtered_trig) + mean * ones + std * base
+
+    def set(self, **params):
+        self.graph.set(**params)
+        return self
+
+    def __getitem__(self, name):
+        return self.graph.get(name)
+
+
+class BlitManager:
+    # Фон фігури знімається після повного перемальовування; оновлення —
+    # відновити фон, намалювати лише анімовані лінії (і змінені осі слайдерів) і blit
+    def __init__(self, canvas, artists):
+        self.canvas = canvas
+        self.artists = list(artists)
+        self.background = None
+        for artist in self.artists:
+            artist.set_animated(True)
+        canvas.mpl_connect("draw_event", self._on_draw)
+
+    def _on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        for artist in self.artists:
+            self.canvas.figure.draw_artist(artist)
+
+    def update(self, extra=()):
+        if self.background is None or not self.canvas.supports_blit:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.background)
+        for artist in extra:
+            self.canvas.figure.draw_artist(artist)
+        self._draw_animated()
+        self.canvas.blit(self.canvas.figure.bbox)
+        self.canvas.flush_events()
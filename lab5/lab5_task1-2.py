@@ -1,10 +1,16 @@
+import argparse
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.widgets import Slider, Button, CheckButtons
-from scipy.signal import iirfilter, filtfilt
+from harmonic_engine import BlitManager, HarmonicModel
+from signal_stream import StreamedHarmonic
 
-# Часовий інтервал
-t = np.linspace(0, 2 * np.pi, 1000)
+# Довжина сигналу: короткий тримається в пам'яті цілком, довгий (--samples 10000000)
+# рахується потоком блоками і показується проріджено (min/max на відрізок)
+parser = argparse.ArgumentParser(description="Гармоніка з шумом і фільтрацією")
+parser.add_argument("--samples", type=int, default=1000, help="кількість відліків сигналу")
+parser.add_argument("--stream-above", type=int, default=200_000, help="поріг потокової обробки")
+args, _ = parser.parse_known_args()
 
 # Початкові параметри
 init = {
@@ -17,38 +23,34 @@ init = {
     'show_filtered': True,
 }
 
-# Поточний шум
-last_noise = np.random.normal(init['noise_mean'], init['noise_std'], size=len(t))
-
-# Чиста гармоніка
-def clean_harmonic(A, f, phi):
-    return A * np.sin(2 * np.pi * f * t + phi)
-
-# Фільтрація
-def apply_filter_iir(signal, cutoff=2.0, order=4):
-    fs = 1 / (t[1] - t[0])
-    b, a = iirfilter(order, cutoff / (0.5 * fs), btype='low', ftype='butter')
-    return filtfilt(b, a, signal)
+# Модель з кешованими проміжними величинами: шум — масштабований N(0, 1),
+# синус — з кешованих sin/cos, коефіцієнти фільтра — за (cutoff, order, fs)
+params = dict(A=init['A'], f=init['f'], phi=init['phi'],
+              noise_mean=init['noise_mean'], noise_std=init['noise_std'])
+if args.samples > args.stream_above:
+    model = StreamedHarmonic(args.samples, **params)
+else:
+    # Часовий інтервал
+    model = HarmonicModel(np.linspace(0, 2 * np.pi, args.samples), **params)
 
 # Графік
 fig, ax = plt.subplots()
 plt.subplots_adjust(left=0.25, bottom=0.35)
 
-# Початкові дані
-pure = clean_harmonic(init['A'], init['f'], init['phi'])
-y0 = pure + last_noise
-
 # Лінії
-l_signal, = ax.plot(t, y0, label="Зашумлена гармоніка")
-l_filtered, = ax.plot(t, apply_filter_iir(y0), 'g--', label="Фільтрована")
-l_clean, = ax.plot(t, pure, 'k:', label="Чиста гармоніка")
+l_signal, = ax.plot(model.t, model['signal'], label="Зашумлена гармоніка")
+l_filtered, = ax.plot(model.t, model['filtered'], 'g--', label="Фільтрована")
+l_clean, = ax.plot(model.t, model['pure'], 'k:', label="Чиста гармоніка")
 
 ax.set_title("Гармоніка з шумом, фільтрацією та чиста")
 ax.legend(loc="upper right")
 
 # Слайдери
+# drawon=False: слайдер не викликає повне перемальовування, його осі дорисовуються в blit
 def create_slider(ax_rect, label, valmin, valmax, valinit, step=None):
-    return Slider(plt.axes(ax_rect), label, valmin, valmax, valinit=valinit, valstep=step)
+    slider = Slider(plt.axes(ax_rect), label, valmin, valmax, valinit=valinit, valstep=step)
+    slider.drawon = False
+    return slider
 
 s_amp = create_slider([0.25, 0.30, 0.65, 0.03], 'A', 0.1, 5, init['A'])
 s_freq = create_slider([0.25, 0.25, 0.65, 0.03], 'f', 0.1, 5, init['f'])
@@ -64,34 +66,27 @@ check = CheckButtons(check_ax, ['Шум', 'Фільтр', 'Чиста'], [init['
 reset_ax = plt.axes([0.05, 0.85, 0.15, 0.05])
 button = Button(reset_ax, 'Reset')
 
+sliders = [s_amp, s_freq, s_phase, s_nmean, s_nstd]
+blit = BlitManager(fig.canvas, [l_signal, l_filtered, l_clean])
+
 # Оновлення графіка 
+# Рахуються лише видимі лінії і лише ті вузли моделі, чиї параметри змінились
 def update(val=None):
-    global last_noise
-    A = s_amp.val
-    f = s_freq.val
-    phi = s_phase.val
-    mean = s_nmean.val
-    std = s_nstd.val
+    model.set(A=s_amp.val, f=s_freq.val, phi=s_phase.val,
+              noise_mean=s_nmean.val, noise_std=s_nstd.val)
     show_noise, show_filtered, show_clean = check.get_status()
-  
-    last_noise = np.random.normal(mean, std, size=len(t))
-
-    pure = clean_harmonic(A, f, phi)
-    signal = pure + last_noise
-
-    l_signal.set_ydata(signal)
-    l_signal.set_visible(show_noise)
-
-    l_filtered.set_ydata(apply_filter_iir(signal))
-    l_filtered.set_visible(show_filtered)
 
-    l_clean.set_ydata(pure)
-    l_clean.set_visible(show_clean)
+    for line, name, visible in [(l_signal, 'signal', show_noise),
+                                (l_filtered, 'filtered', show_filtered),
+                                (l_clean, 'pure', show_clean)]:
+        line.set_visible(visible)
+        if visible:
+            line.set_ydata(model[name])
 
-    fig.canvas.draw_idle()
+    blit.update([s.ax for s in sliders])
 
 # Прив'язка слайдерів і чекбоксів
-for s in [s_amp, s_freq, s_phase, s_nmean, s_nstd]:
+for s in sliders:
     s.on_changed(update)
 check.on_clicked(update)
 
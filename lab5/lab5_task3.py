@@ -1,9 +1,25 @@
+import argparse
+import base64
+import json
+import os
+import secrets
 import numpy as np
-from dash import Dash, dcc, html, Input, Output
-import plotly.graph_objs as go
+from dash import Dash, dcc, html, Input, Output, Patch, State
+from filters import FILTERS, apply_filter, savgol_window, window_cutoff
+from line_cache import CACHE_DIR, DiskLRU
+from signal_stream import OverlapFilter, lowpass_stream, stream_view
 
 # --- Параметри ---
-t = np.linspace(0, 2 * np.pi, 1000)
+# Сигнали довші за STREAM_ABOVE рахуються потоком і показуються проріджено
+# Під gunicorn командного рядка немає — параметри також через змінні середовища
+SAMPLES = int(os.environ.get('LAB5_SAMPLES', 1000))
+STREAM_ABOVE = 200_000
+# Кожна сесія (відкриття сторінки) отримує свій seed шуму; LAB5_SEED фіксує його для всіх
+SEED = os.environ.get('LAB5_SEED')
+t = np.linspace(0, 2 * np.pi, SAMPLES) if SAMPLES <= STREAM_ABOVE else None
+# Лінії кешуються за (samples, seed, параметри) у процесі; спільний для воркерів
+# каталог — лише для дорогих (потокових) ліній, короткі дешевше перерахувати
+cache = DiskLRU(os.environ.get('LAB5_CACHE_DIR', CACHE_DIR))
 init = {
     'A': 1.0,
     'f': 1.0,
@@ -11,66 +27,146 @@ init = {
     'noise_mean': 0.0,
     'noise_std': 0.3,
     'filter_window': 10,
+    'filter_type': 'Ковзне середнє',
 }
+# Порядок ліній у фігурі: (пункт у списку "Що показувати", назва лінії)
+TRACES = [('Чиста', 'Чиста гармоніка'), ('З шумом', 'З шумом'), ('Фільтрована', 'Фільтрована')]
 
 # --- Чиста гармоніка ---
 def pure_harmonic(A, f, phi):
     return A * np.sin(2 * np.pi * f * t + phi)
 
 # --- Генерація шуму ---
+# Власний np.random.Generator на кожен виклик замість глобального np.random.seed:
+# паралельні запити різних сесій не змішують стан генератора.
+# N(0, 1) кешується за (seed, size), mean і std лише масштабують його
+@cache.memoize()
+def noise_base(seed, size):
+    return np.random.default_rng(seed).standard_normal(size)
+
 def generate_noise(mean, std, size=1000, seed=None):
-    if seed is not None:
-        np.random.seed(seed)
-    return np.random.normal(mean, std, size)
+    if seed is None:
+        return np.random.default_rng().normal(mean, std, size)
+    return mean + std * noise_base(seed, size)
+
+# --- Фільтр (банк фільтрів у filters.py) ---
+# Ковзне середнє — за O(n) через кумулятивні суми і з поправкою на краях
+def moving_average_filter(signal, window_size, filter_type=init['filter_type']):
+    return apply_filter(filter_type, signal, window_size, 1 / (t[1] - t[0]))
 
-# --- Фільтр (ковзне середнє) ---
-def moving_average_filter(signal, window_size):
-    filtered = np.convolve(signal, np.ones(window_size)/window_size, mode='same')
-    return filtered
+def stream_filter(filter_type, window_size):
+    # Потоковий варіант: IIR — з перекриттям за часом згасання, решта — на вікно
+    if filter_type == 'Баттерворт (IIR)':
+        return lambda fs: lowpass_stream(window_cutoff(window_size, fs), 4, fs)
+    # pad — вікно, яким фільтр справді користується (Савицький–Голей розширює його)
+    pad = savgol_window(window_size) if filter_type == 'Савицького–Голея' else window_size
+    return lambda fs: OverlapFilter(lambda s: apply_filter(filter_type, s, window_size, fs), pad)
+
+# --- Лінії з кешем за параметрами, від яких вони залежать ---
+@cache.memoize(maxsize=256)
+def signal_lines(samples, seed, A, f, phi, noise_mean, noise_std):
+    if samples > STREAM_ABOVE:
+        x, lines = stream_view(A, f, phi, noise_mean, noise_std, samples, None, seed=seed)
+        return x, lines["pure"], lines["signal"]
+    pure = pure_harmonic(A, f, phi)
+    return t, pure, pure + generate_noise(noise_mean, noise_std, size=samples, seed=seed)
 
-# --- Початкові дані ---
-noise = generate_noise(init['noise_mean'], init['noise_std'])
-pure = pure_harmonic(init['A'], init['f'], init['phi'])
-noisy = pure + noise
-filtered = moving_average_filter(noisy, init['filter_window'])
+@cache.memoize(maxsize=256)
+def filtered_line(samples, seed, A, f, phi, noise_mean, noise_std, filt_type, window):
+    if samples > STREAM_ABOVE:
+        # Фільтр блоками з перекриттям (див. signal_stream.OverlapFilter)
+        return stream_view(A, f, phi, noise_mean, noise_std, samples,
+                           stream_filter(filt_type, window), seed=seed)[1]["filtered"]
+    noisy = signal_lines(samples, seed, A, f, phi, noise_mean, noise_std)[2]
+    return moving_average_filter(noisy, window, filt_type)
+
+def typed_array(values):
+    # Бінарний масив plotly.js (float32 у base64) замість JSON-списку чисел:
+    # у 3-4 рази менше байтів і без розбору чисел у браузері
+    data = np.ascontiguousarray(values, dtype='<f4').tobytes()
+    return {'dtype': 'f4', 'bdata': base64.b64encode(data).decode('ascii')}
+
+def make_figure(seed, A, f, phi, noise_mean, noise_std, filt_window, show_opts, filt_color, filt_type):
+    # Повна фігура — лише при відкритті сторінки; далі вона змінюється частково
+    x, pure, noisy = signal_lines(SAMPLES, seed, A, f, phi, noise_mean, noise_std)
+    filtered = filtered_line(SAMPLES, seed, A, f, phi, noise_mean, noise_std, filt_type, int(filt_window))
+    x = typed_array(x)
+    data = [{'type': 'scatter', 'mode': 'lines', 'name': name, 'x': x, 'y': typed_array(y),
+             'visible': option in show_opts}
+            for (option, name), y in zip(TRACES, (pure, noisy, filtered))]
+    data[2]['line'] = {'color': filt_color}
+    return {'data': data,
+            'layout': {'title': {'text': 'Інтерактивна візуалізація гармоніки'},
+                       'xaxis': {'title': {'text': 'Час'}},
+                       'yaxis': {'title': {'text': 'Амплітуда'}},
+                       'height': 600}}
 
 # --- Dash App ---
 app = Dash(__name__)
-app.layout = html.Div([
-    html.H2("Гармоніка з шумом та фільтрація (Plotly + власний фільтр)"),
-    dcc.Graph(id='harmonic-plot'),
-
-    html.Div([
-        html.Label("Амплітуда (A)"),
-        dcc.Slider(0.1, 5.0, step=0.1, value=init['A'], id='amp-slider'),
-        html.Label("Частота (f)"),
-        dcc.Slider(0.1, 5.0, step=0.1, value=init['f'], id='freq-slider'),
-        html.Label("Фаза (phi)"),
-        dcc.Slider(0, 2*np.pi, step=0.1, value=init['phi'], id='phi-slider'),
-        html.Label("Середнє шуму"),
-        dcc.Slider(-1, 1, step=0.1, value=init['noise_mean'], id='mean-slider'),
-        html.Label("Стд. відх. шуму"),
-        dcc.Slider(0.01, 1.0, step=0.01, value=init['noise_std'], id='std-slider'),
-        html.Label("Вікно фільтру (розмір)"),
-        dcc.Slider(1, 100, step=1, value=init['filter_window'], id='filter-slider'),
-    ], style={'width': '45%', 'display': 'inline-block', 'padding': '20px'}),
-
-    html.Div([
-        html.Label("Що показувати:"),
-        dcc.Checklist(
-            ['Чиста', 'З шумом', 'Фільтрована'],
-            ['Чиста', 'З шумом', 'Фільтрована'],
-            id='show-options'
-        ),
-        html.Label("Вибір кольору фільтрованої"),
-        dcc.Dropdown(
-            ['green', 'red', 'blue', 'orange'],
-            value='green',
-            id='filter-color'
-        ),
-    ], style={'width': '45%', 'display': 'inline-block', 'padding': '20px'}),
-])
+# WSGI-додаток для gunicorn: gunicorn -w 4 -b 127.0.0.1:8050 lab5_task3:server
+server = app.server
+
+def serve_layout():
+    # Функція, а не готовий Div: фігура будується при кожному відкритті сторінки
+    # і враховує SAMPLES, заданий з командного рядка. Seed сесії (< 2**53, щоб
+    # без втрат пройти через JSON у браузер) зберігається на сторінці і
+    # повертається з кожним запитом — будь-який воркер відтворить той самий шум
+    seed = int(SEED) if SEED is not None else secrets.randbits(53)
+    figure = make_figure(seed, init['A'], init['f'], init['phi'], init['noise_mean'], init['noise_std'],
+                         init['filter_window'], [option for option, _ in TRACES], 'green', init['filter_type'])
+    return html.Div([
+        html.H2("Гармоніка з шумом та фільтрація (Plotly + власний фільтр)"),
+        dcc.Store(id='session-seed', data=seed),
+        html.Small(f"seed шуму: {seed}"),
+        dcc.Graph(id='harmonic-plot', figure=figure),
 
+        html.Div([
+            html.Label("Амплітуда (A)"),
+            dcc.Slider(0.1, 5.0, step=0.1, value=init['A'], id='amp-slider'),
+            html.Label("Частота (f)"),
+            dcc.Slider(0.1, 5.0, step=0.1, value=init['f'], id='freq-slider'),
+            html.Label("Фаза (phi)"),
+            dcc.Slider(0, 2*np.pi, step=0.1, value=init['phi'], id='phi-slider'),
+            html.Label("Середнє шуму"),
+            dcc.Slider(-1, 1, step=0.1, value=init['noise_mean'], id='mean-slider'),
+            html.Label("Стд. відх. шуму"),
+            dcc.Slider(0.01, 1.0, step=0.01, value=init['noise_std'], id='std-slider'),
+            html.Label("Вікно фільтру (розмір)"),
+            dcc.Slider(1, 100, step=1, value=init['filter_window'], id='filter-slider'),
+        ], style={'width': '45%', 'display': 'inline-block', 'padding': '20px'}),
+
+        html.Div([
+            html.Label("Що показувати:"),
+            dcc.Checklist(
+                ['Чиста', 'З шумом', 'Фільтрована'],
+                ['Чиста', 'З шумом', 'Фільтрована'],
+                id='show-options'
+            ),
+            html.Label("Тип фільтру"),
+            dcc.Dropdown(list(FILTERS), value=init['filter_type'], id='filter-type'),
+            html.Label("Вибір кольору фільтрованої"),
+            dcc.Dropdown(
+                ['green', 'red', 'blue', 'orange'],
+                value='green',
+                id='filter-color'
+            ),
+        ], style={'width': '45%', 'display': 'inline-block', 'padding': '20px'}),
+    ])
+
+app.layout = serve_layout
+
+def session_seed(data):
+    # Seed приходить з браузера — довіряти можна лише цілому з [0, 2**53)
+    try:
+        seed = int(data)
+    except (TypeError, ValueError, OverflowError):
+        return secrets.randbits(53)
+    return seed if 0 <= seed < 2**53 else secrets.randbits(53)
+
+# --- Колбеки: кожен оновлює лише свої лінії ---
+# Вісь x і оформлення вже у браузері; сервер надсилає Patch з новими y.
+# Сигнал не залежить від фільтра, тож зміна вікна чи типу фільтра
+# не перераховує шум, а повторні значення слайдерів беруться з кешу
 @app.callback(
     Output('harmonic-plot', 'figure'),
     Input('amp-slider', 'value'),
@@ -78,29 +174,88 @@ app.layout = html.Div([
     Input('phi-slider', 'value'),
     Input('mean-slider', 'value'),
     Input('std-slider', 'value'),
+    State('session-seed', 'data'),
+    prevent_initial_call=True
+)
+def update_signal(A, f, phi, noise_mean, noise_std, seed):
+    seed = session_seed(seed)
+    _, pure, noisy = signal_lines(SAMPLES, seed, A, f, phi, noise_mean, noise_std)
+    patch = Patch()
+    patch['data'][0]['y'] = typed_array(pure)
+    patch['data'][1]['y'] = typed_array(noisy)
+    return patch
+
+@app.callback(
+    Output('harmonic-plot', 'figure', allow_duplicate=True),
+    Input('amp-slider', 'value'),
+    Input('freq-slider', 'value'),
+    Input('phi-slider', 'value'),
+    Input('mean-slider', 'value'),
+    Input('std-slider', 'value'),
     Input('filter-slider', 'value'),
+    Input('filter-type', 'value'),
+    State('session-seed', 'data'),
+    prevent_initial_call=True
+)
+def update_filtered(A, f, phi, noise_mean, noise_std, filt_window, filt_type, seed):
+    seed = session_seed(seed)
+    filtered = filtered_line(SAMPLES, seed, A, f, phi, noise_mean, noise_std, filt_type, int(filt_window))
+    patch = Patch()
+    patch['data'][2]['y'] = typed_array(filtered)
+    return patch
+
+# Видимість ліній і колір — без сервера: лише властивості вже завантажених ліній
+app.clientside_callback(
+    """
+    function(show, color, figure) {
+        const options = %s;
+        const data = figure.data.map((trace, i) =>
+            Object.assign({}, trace, {visible: show.includes(options[i])}));
+        data[2].line = Object.assign({}, data[2].line, {color: color});
+        return Object.assign({}, figure, {data: data});
+    }
+    """ % json.dumps([option for option, _ in TRACES]),
+    Output('harmonic-plot', 'figure', allow_duplicate=True),
     Input('show-options', 'value'),
-    Input('filter-color', 'value')
+    Input('filter-color', 'value'),
+    State('harmonic-plot', 'figure'),
+    prevent_initial_call=True
 )
-def update_plot(A, f, phi, noise_mean, noise_std, filt_window, show_opts, filt_color):
-    pure = pure_harmonic(A, f, phi)
-    noise = generate_noise(noise_mean, noise_std, size=len(t))
-    noisy = pure + noise
-    filtered = moving_average_filter(noisy, int(filt_window))
-
-    fig = go.Figure()
-    if 'Чиста' in show_opts:
-        fig.add_trace(go.Scatter(x=t, y=pure, mode='lines', name='Чиста гармоніка'))
-    if 'З шумом' in show_opts:
-        fig.add_trace(go.Scatter(x=t, y=noisy, mode='lines', name='З шумом'))
-    if 'Фільтрована' in show_opts:
-        fig.add_trace(go.Scatter(x=t, y=filtered, mode='lines', name='Фільтрована', line=dict(color=filt_color)))
-
-    fig.update_layout(title='Інтерактивна візуалізація гармоніки',
-                      xaxis_title='Час',
-                      yaxis_title='Амплітуда',
-                      height=600)
-    return fig
+
+# --- Сервер з кількома воркерами (лише локально) ---
+def serve(workers, port):
+    # Кожен воркер — окремий процес зі своїм lru_cache; спільні лише файли DiskLRU,
+    # а стан генераторів не спільний зовсім, тож пропускна здатність росте з воркерами
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        print("gunicorn не встановлено (є лише для Linux/macOS) — один процес з потоками")
+        app.run(host='127.0.0.1', port=port, threaded=True)
+        return
+
+    class LocalServer(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f'127.0.0.1:{port}')
+            self.cfg.set('workers', workers)
+
+        def load(self):
+            return server
+
+    LocalServer().run()
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    parser = argparse.ArgumentParser(description="Dash: гармоніка з шумом і фільтрацією")
+    parser.add_argument("--samples", type=int, default=SAMPLES, help="кількість відліків сигналу")
+    parser.add_argument("--seed", type=int, help="один seed шуму для всіх сесій (відтворюваність)")
+    parser.add_argument("--workers", type=int, default=1, help="процесів-воркерів (gunicorn); 1 — сервер розробки")
+    parser.add_argument("--port", type=int, default=8050)
+    args = parser.parse_args()
+    if args.samples != SAMPLES:
+        SAMPLES = args.samples
+        t = np.linspace(0, 2 * np.pi, SAMPLES) if SAMPLES <= STREAM_ABOVE else None
+    if args.seed is not None:
+        SEED = args.seed
+    if args.workers > 1:
+        serve(args.workers, args.port)
+    else:
+        app.run(debug=True, port=args.port)
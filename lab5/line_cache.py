@@ -0,0 +1,104 @@
+import hashlib
+import os
+import tempfile
+import time
+from functools import lru_cache, wraps
+
+import numpy as np
+
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "lab5-lines")
+CACHE_BYTES = 256 * 2**20
+# Обчислення, швидші за це, на диск не пишуться: запис і читання .npz дорожчі
+# за повторний розрахунок (лінія з 1000 точок рахується за десятки мікросекунд)
+DISK_MIN_SECONDS = 0.05
+
+
+def _read_only(value):
+    # Кешовані масиви спільні для всіх запитів процесу — лише для читання
+    for array in value if isinstance(value, tuple) else (value,):
+        array.setflags(write=False)
+    return value
+
+
+class DiskLRU:
+    # Спільний для кількох процесів (воркерів сервера) кеш масивів у каталозі:
+    # файл на ключ, запис через тимчасовий файл і os.replace (читач ніколи не
+    # бачить недописаний файл), час доступу — mtime файлу. Каталог переглядається
+    # не на кожен запис, а після кожних max_bytes / 8 записаних процесом байтів;
+    # тоді найдавніше використані файли видаляються до 3/4 max_bytes. Між
+    # переглядами розмір може перевищити межу на max_bytes / 8 на процес
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_BYTES, min_seconds=DISK_MIN_SECONDS):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.min_seconds = min_seconds
+        self.written = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(repr(key).encode()).hexdigest()[:32] + ".npz")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with np.load(path) as stored:
+                value = stored["value"] if "value" in stored.files else \
+                    tuple(stored[f"arr_{i}"] for i in range(len(stored.files)))
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            # Немає файлу, його щойно витіснив інший процес або він пошкоджений
+            return None
+        return value
+
+    def put(self, key, value):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            if isinstance(value, tuple):
+                np.savez(f, *value)
+            else:
+                np.savez(f, value=value)
+        os.replace(tmp_path, path)
+        self.written += os.path.getsize(path)
+        if self.written >= self.max_bytes // 8:
+            self.written = 0
+            self._evict()
+
+    def _evict(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".npz"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes * 3 // 4:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def memoize(self, maxsize=128):
+        # Два рівні: lru_cache у процесі, далі спільний каталог, далі обчислення.
+        # На диск потрапляють лише результати, що рахувалися довше за min_seconds.
+        # Аргументи мають бути хешованими і з детермінованим repr (числа, рядки)
+        def wrap(fn):
+            @lru_cache(maxsize=maxsize)
+            @wraps(fn)
+            def cached(*args):
+                key = (fn.__module__, fn.__name__) + args
+                value = self.get(key)
+                if value is None:
+                    start = time.perf_counter()
+                    value = fn(*args)
+                    if time.perf_counter() - start >= self.min_seconds:
+                        self.put(key, value)
+                return _read_only(value)
+            return cached
+        return wrap
@@ -0,0 +1,280 @@
+import numpy as np
+from scipy.interpolate import CubicSpline
+from scipy.signal import sosfilt, sosfilt_zi, sosfiltfilt
+
+from filters import lowpass_sos
+
+BLOCK_SIZE = 65_536
+# Прямий прохід низькочастотного фільтра зберігається з частотою не нижчою за DECIMATED_RATE * cutoff
+DECIMATED_RATE = 200
+DISPLAY_POINTS = 2000
+DURATION = 2 * np.pi
+
+
+def time_step(n_samples, duration=DURATION):
+    # Той самий крок, що й у np.linspace(0, duration, n_samples)
+    return duration / (n_samples - 1)
+
+
+# === Джерела: гармоніка і шум блоками фіксованого розміру ===
+def harmonic_blocks(A, f, phi, n_samples, dt, block=BLOCK_SIZE):
+    for start in range(0, n_samples, block):
+        t = np.arange(start, min(start + block, n_samples)) * dt
+        yield A * np.sin(2 * np.pi * f * t + phi)
+
+
+def normal_blocks(n_samples, seed=None, block=BLOCK_SIZE):
+    # N(0, 1) з одного потоку генератора: послідовність не залежить від розміру блоку
+    rng = np.random.default_rng(seed)
+    for start in range(0, n_samples, block):
+        yield rng.standard_normal(min(block, n_samples - start))
+
+
+# === Фільтри з переносом стану між блоками ===
+class CausalFilter:
+    # sosfilt зі станом zi між блоками — збігається з sosfilt по всьому сигналу
+    def __init__(self, sos):
+        self.sos = sos
+        self.zi = np.zeros((len(sos), 2))
+
+    def push(self, block):
+        out, self.zi = sosfilt(self.sos, block, zi=self.zi)
+        return out
+
+    def flush(self):
+        return np.empty(0)
+
+
+def settle_length(sos, tol=1e-10, limit=1_000_000):
+    # Скільки відліків потрібно, щоб імпульсна характеристика згасла до tol від піку.
+    # Приблизно 10 * fs / cutoff для Баттерворта 4-го порядку: для дуже низького
+    # зрізу це мільйони відліків — тоді помилка, а не мовчки обрізаний pad
+    n = 256
+    while True:
+        impulse = np.zeros(n)
+        impulse[0] = 1.0
+        h = np.abs(sosfilt(sos, impulse))
+        above = np.flatnonzero(h > tol * h.max())
+        if above[-1] < n - 1:
+            return int(above[-1]) + 1
+        if n >= limit:
+            raise ValueError(f"Імпульсна характеристика не згасає за {limit} відліків — "
+                             f"зріз надто низький для цієї частоти дискретизації (див. lowpass_stream)")
+        n = min(n * 4, limit)
+
+
+def filtfilt_padlen(sos):
+    # Типова довжина непарного продовження в sosfiltfilt
+    return 3 * (2 * len(sos) + 1 - min((sos[:, 2] == 0).sum(), (sos[:, 5] == 0).sum()))
+
+
+class OverlapFilter:
+    # Фільтр над цілим сегментом (sosfiltfilt, центроване ковзне середнє, ...)
+    # блоками з перекриттям: кожен сегмент береться з pad відліками історії
+    # і pad відліками наперед, зберігається лише середина. Перехідні процеси на
+    # краях сегмента згасають у межах pad, тому для filtfilt результат відрізняється
+    # від обробки всього сигналу не більше ніж на ~tol * max|x|. Вихід видається
+    # порціями щонайменше по pad відліків (інакше кожен блок перераховував би
+    # 2 * pad історії), тож пам'ять — O(block + 3 * pad), затримка — до 2 * pad.
+    # pad росте як fs / cutoff — для низьких зрізів див. DecimatedFilter
+    def __init__(self, segment_filter, pad):
+        self.segment_filter = segment_filter
+        self.pad = int(pad)
+        self.history = np.empty(0)
+        self.pending = np.empty(0)
+
+    @classmethod
+    def filtfilt(cls, sos, tol=1e-10):
+        return cls(lambda x: sosfiltfilt(sos, x), settle_length(sos, tol) + filtfilt_padlen(sos))
+
+    def push(self, block):
+        self.pending = np.concatenate([self.pending, block])
+        ready = len(self.pending) - self.pad
+        if ready < max(self.pad, 1):
+            return np.empty(0)
+        return self._emit(ready)
+
+    def flush(self):
+        return self._emit(len(self.pending)) if len(self.pending) else np.empty(0)
+
+    def _emit(self, ready):
+        segment = np.concatenate([self.history, self.pending])
+        out = self.segment_filter(segment)[len(self.history):len(self.history) + ready]
+        self.history = segment[:len(self.history) + ready][-self.pad:] if self.pad else np.empty(0)
+        self.pending = self.pending[ready:]
+        return out
+
+
+class DecimatedFilter:
+    # sosfiltfilt зі зрізом, набагато нижчим за fs, з пам'яттю, що не росте з fs.
+    # Прямий прохід — точно як у sosfiltfilt (непарне продовження на pad відліків,
+    # початковий стан zi * ext[0]) на повній частоті, потоком. Його вихід уже
+    # обмежений смугою до cutoff, тому зберігається лише кожен factor-й відлік
+    # (fs / factor >= DECIMATED_RATE * cutoff). У flush — зворотний прохід на
+    # повній частоті від стану zi * y[-1] по відновленому кубічним сплайном
+    # прямому виходу: спершу від кінця до початку, запам'ятовуючи стан на межах
+    # блоків, потім блоки по порядку від цих станів — вихід іде шматками до
+    # BLOCK_SIZE. Відхилення від sosfiltfilt — похибка сплайна, ~1e-8 від амплітуди,
+    # на всьому сигналі разом із краями. Пам'ять — DECIMATED_RATE * cutoff
+    # відліків на одиницю часу плюс стан на кожен BLOCK_SIZE, затримка — весь сигнал
+    def __init__(self, cutoff, order, fs, block=BLOCK_SIZE):
+        self.sos = lowpass_sos(cutoff, order, fs)
+        self.factor = max(1, int(fs / (DECIMATED_RATE * cutoff)))
+        self.pad = filtfilt_padlen(self.sos)
+        self.block = block
+        self.zi = None
+        self.head = np.empty(0)
+        self.tail = np.empty(0)
+        self.n_in = 0
+        self.samples = []
+
+    def push(self, block):
+        # Відліки для правого продовження — останні pad + 1
+        self.tail = np.concatenate([self.tail, block])[-(self.pad + 1):]
+        if self.zi is None:
+            # Для лівого продовження потрібні перші pad + 1 відліків
+            self.head = np.concatenate([self.head, block])
+            if len(self.head) <= self.pad:
+                return ()
+            block, self.head = self.head, None
+            ext = 2 * block[0] - block[self.pad:0:-1]
+            _, self.zi = sosfilt(self.sos, ext, zi=sosfilt_zi(self.sos) * ext[0])
+        self._forward(block)
+        return ()
+
+    def flush(self):
+        if self.zi is None:
+            raise ValueError(f"Сигнал коротший за {self.pad + 1} відліків")
+        x = self.tail
+        n = self.n_in
+        y_ext = self._forward(2 * x[-1] - x[-2::-1])
+        values = np.concatenate(self.samples)
+        t = np.arange(len(values)) * self.factor
+        if t[-1] != self.n_in - 1:
+            t = np.append(t, self.n_in - 1)
+            values = np.append(values, y_ext[-1])
+        spline = CubicSpline(t, values)
+
+        # Кінець продовження — точні значення; далі стан на початку кожного блоку
+        _, zi = sosfilt(self.sos, y_ext[::-1], zi=sosfilt_zi(self.sos) * y_ext[-1])
+        starts = range(0, n, self.block)
+        states = {}
+        for start in reversed(starts):
+            states[start] = zi
+            stop = min(start + self.block, n)
+            _, zi = sosfilt(self.sos, spline(np.arange(stop - 1, start - 1, -1)), zi=zi)
+        return self._chunks(starts, n, spline, states)
+
+    def _forward(self, x):
+        y, self.zi = sosfilt(self.sos, x, zi=self.zi)
+        self.samples.append(y[(-self.n_in) % self.factor::self.factor])
+        self.n_in += len(x)
+        return y
+
+    def _chunks(self, starts, n, spline, states):
+        for start in starts:
+            stop = min(start + self.block, n)
+            out, _ = sosfilt(self.sos, spline(np.arange(stop - 1, start - 1, -1)), zi=states[start])
+            yield out[::-1]
+
+
+def lowpass_stream(cutoff, order, fs, tol=1e-10):
+    # Потоковий filtfilt Баттерворта з обмеженою пам'яттю для будь-якого зрізу
+    if fs / cutoff > DECIMATED_RATE * 2:
+        return DecimatedFilter(cutoff, order, fs)
+    return OverlapFilter.filtfilt(lowpass_sos(cutoff, order, fs), tol)
+
+
+# === Проріджене відображення ===
+class MinMaxView:
+    # Мінімум і максимум у кожному з width відрізків сигналу: екстремуми
+    # (піки шуму) не губляться, розмір не залежить від довжини сигналу
+    def __init__(self, n_samples, width=DISPLAY_POINTS):
+        self.n_samples = n_samples
+        self.width = min(width, n_samples)
+        self.low = np.full(self.width, np.inf)
+        self.high = np.full(self.width, -np.inf)
+        self.offset = 0
+
+    def push(self, block):
+        if len(block) == 0:
+            return
+        bins = (np.arange(self.offset, self.offset + len(block)) * self.width) // self.n_samples
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(bins)) + 1])
+        first = bins[starts]
+        np.minimum.at(self.low, first, np.minimum.reduceat(block, starts))
+        np.maximum.at(self.high, first, np.maximum.reduceat(block, starts))
+        self.offset += len(block)
+
+    def edges(self):
+        # Номер першого відліку кожного відрізка
+        return -(-np.arange(self.width) * self.n_samples // self.width)
+
+    def xy(self, dt):
+        # Пари (min, max) у кожному відрізку — лінія з 2 * width точок
+        t = np.repeat(self.edges() * dt, 2)
+        y = np.column_stack([self.low, self.high]).ravel()
+        return t, y
+
+
+def _push_output(view, out):
+    # Фільтри повертають масив, DecimatedFilter — послідовність шматків
+    for part in (out,) if isinstance(out, np.ndarray) else out:
+        view.push(part)
+
+
+def stream_view(A, f, phi, noise_mean, noise_std, n_samples, make_filter,
+                seed=None, block=BLOCK_SIZE, width=DISPLAY_POINTS, duration=DURATION):
+    # Генератор -> шум -> фільтр блоками; на виході лише проріджені лінії.
+    # make_filter(fs) повертає об'єкт з push/flush (CausalFilter, OverlapFilter);
+    # make_filter=None — лише чиста і зашумлена лінії, без фільтрації
+    dt = time_step(n_samples, duration)
+    filt = make_filter(1 / dt) if make_filter else None
+    names = ("pure", "signal", "filtered") if filt else ("pure", "signal")
+    views = {name: MinMaxView(n_samples, width) for name in names}
+    for pure, base in zip(harmonic_blocks(A, f, phi, n_samples, dt, block),
+                          normal_blocks(n_samples, seed, block)):
+        signal = pure + (noise_mean + noise_std * base)
+        views["pure"].push(pure)
+        views["signal"].push(signal)
+        if filt:
+            _push_output(views["filtered"], filt.push(signal))
+    if filt:
+        _push_output(views["filtered"], filt.flush())
+    t = views["pure"].xy(dt)[0]
+    return t, {name: view.xy(dt)[1] for name, view in views.items()}
+
+
+class StreamedHarmonic:
+    # Той самий інтерфейс, що й у HarmonicModel (set / [name] / t), але для
+    # довгих сигналів: усе рахується потоком, у пам'яті лише проріджені лінії.
+    # Шум бере той самий seed при кожному проході, тож змінюється лише масштаб
+    def __init__(self, n_samples, A=1.0, f=1.0, phi=0.0, noise_mean=0.0, noise_std=0.2,
+                 cutoff=2.0, order=4, seed=0, block=BLOCK_SIZE, width=DISPLAY_POINTS):
+        self.n_samples = n_samples
+        self.params = dict(A=A, f=f, phi=phi, noise_mean=noise_mean, noise_std=noise_std,
+                           cutoff=cutoff, order=order)
+        self.seed, self.block, self.width = seed, block, width
+        self._key = None
+        self._lines = None
+        self.t = None
+        self._compute()
+
+    def set(self, **params):
+        self.params.update(params)
+        return self
+
+    def _compute(self):
+        key = tuple(sorted(self.params.items()))
+        if key == self._key:
+            return
+        p = self.params
+        self.t, self._lines = stream_view(
+            p["A"], p["f"], p["phi"], p["noise_mean"], p["noise_std"], self.n_samples,
+            lambda fs: lowpass_stream(p["cutoff"], p["order"], fs),
+            seed=self.seed, block=self.block, width=self.width)
+        self._key = key
+
+    def __getitem__(self, name):
+        self._compute()
+        return self._lines[name]
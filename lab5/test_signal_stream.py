@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from scipy.signal import sosfiltfilt
+
+from filters import lowpass_sos, savgol, savgol_window
+from signal_stream import DecimatedFilter, OverlapFilter, lowpass_stream, time_step
+
+TOL = 1e-6
+
+
+def stream(filt, signal, block):
+    parts = []
+    for start in range(0, len(signal), block):
+        parts.append(filt.push(signal[start:start + block]))
+    parts.append(filt.flush())
+    # Масив або послідовність шматків (DecimatedFilter)
+    return np.concatenate([p for out in parts for p in ((out,) if isinstance(out, np.ndarray) else out)])
+
+
+def noisy_harmonic(n_samples, seed=0):
+    t = np.arange(n_samples) * time_step(n_samples)
+    return np.sin(t) + 0.2 * np.random.default_rng(seed).standard_normal(n_samples)
+
+
+@pytest.mark.parametrize("n_samples, cutoff, block, kind", [
+    (20_000, 50.0, 4096, OverlapFilter),
+    (5_000, 2.0, 777, OverlapFilter),
+    (200_000, 2.0, 65_536, DecimatedFilter),
+    (1_000_000, 2.0, 10_000, DecimatedFilter),
+])
+def test_lowpass_stream_matches_sosfiltfilt(n_samples, cutoff, block, kind):
+    # Потоковий filtfilt збігається з sosfiltfilt над усім сигналом, разом із краями
+    signal = noisy_harmonic(n_samples)
+    fs = 1 / time_step(n_samples)
+    filt = lowpass_stream(cutoff, 4, fs)
+    assert isinstance(filt, kind)
+
+    out = stream(filt, signal, block)
+    expected = sosfiltfilt(lowpass_sos(cutoff, 4, fs), signal)
+    assert len(out) == n_samples
+    assert np.abs(out - expected).max() < TOL
+
+
+@pytest.mark.parametrize("window", [1, 2, 5, 40])
+def test_overlap_savgol_matches_whole_signal(window):
+    # pad — розширене вікно Савицького–Голея, а не задане
+    signal = noisy_harmonic(50_000)
+    filt = OverlapFilter(lambda s: savgol(s, window), savgol_window(window))
+    assert np.abs(stream(filt, signal, 4096) - savgol(signal, window)).max() < TOL